@@ -0,0 +1,111 @@
+import argparse
+import json
+import time
+
+from graphql import build_schema
+from graphql import introspection_from_schema
+
+from gqt.codec import dumps
+from gqt.codec import loads
+from gqt.codec import orjson
+from gqt.tree import load_tree_from_json
+from gqt.tree import load_tree_from_schema
+
+
+def create_response(number_of_nodes):
+    return {
+        'data': {
+            'repository': {
+                'issues': {
+                    'nodes': [
+                        {
+                            'number': i,
+                            'title': f'Issue number {i} with a title',
+                            'closed': i % 3 == 0,
+                            'score': i / 7,
+                            'author': {'login': f'user{i % 100}'}
+                        }
+                        for i in range(number_of_nodes)
+                    ]
+                }
+            }
+        }
+    }
+
+
+def create_schema(number_of_types):
+    types = []
+
+    for i in range(number_of_types):
+        fields = ' '.join(f'field{j}(arg: Int): String' for j in range(20))
+        next_type = f'Type{(i + 1) % number_of_types}'
+        types.append(f'type Type{i} {{ {fields} next: {next_type} }}')
+
+    fields = ' '.join(f'type{i}: Type{i}' for i in range(number_of_types))
+    types.append(f'type Query {{ {fields} }}')
+
+    return introspection_from_schema(build_schema('\n'.join(types)))
+
+
+def create_tree_json(number_of_types):
+    tree = load_tree_from_schema(create_schema(number_of_types))
+    tree.key_right()
+    tree.select()
+
+    return tree.to_json()
+
+
+def measure(name, function, iterations):
+    function()
+    start_time = time.perf_counter()
+
+    for _ in range(iterations):
+        function()
+
+    elapsed = (time.perf_counter() - start_time) / iterations
+    print(f'{name:32} {1000 * elapsed:10.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the JSON codec with the standard library.')
+    parser.add_argument('--nodes',
+                        type=int,
+                        default=200_000,
+                        help='Number of nodes in the response (default: %(default)s).')
+    parser.add_argument('--types',
+                        type=int,
+                        default=500,
+                        help='Number of types in the schema (default: %(default)s).')
+    parser.add_argument('--iterations',
+                        type=int,
+                        default=5,
+                        help='Number of iterations (default: %(default)s).')
+    args = parser.parse_args()
+
+    if orjson is None:
+        print('Backend: json (orjson is not installed)')
+    else:
+        print('Backend: orjson')
+
+    response = json.dumps(create_response(args.nodes)).encode('utf-8')
+    print(f'Response size: {len(response) / 1_000_000:.1f} MB')
+    measure('Response decode (json)', lambda: json.loads(response), args.iterations)
+    measure('Response decode (codec)', lambda: loads(response), args.iterations)
+
+    tree_json = create_tree_json(args.types)
+    tree_data = json.dumps(tree_json).encode('utf-8')
+    print(f'Query JSON size: {len(tree_data) / 1_000_000:.1f} MB')
+    measure('Schema load (json)',
+            lambda: load_tree_from_json(json.loads(tree_data)),
+            args.iterations)
+    measure('Schema load (codec)',
+            lambda: load_tree_from_json(loads(tree_data)),
+            args.iterations)
+    tree = load_tree_from_json(tree_json)
+    measure('Tree save (json)', lambda: json.dumps(tree.to_json()), args.iterations)
+    measure('Tree save (codec)', lambda: dumps(tree.to_json()), args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import io
+import json
+import sys
+import time
+
+import yaml
+
+from gqt.stream import YAML_DUMPER
+from gqt.stream import iter_events
+from gqt.stream import write_yaml
+
+
+def create_response(size):
+    nodes = []
+    response = {'repository': {'issues': {'nodes': nodes}}}
+    node_size = 0
+
+    while node_size * len(nodes) < size:
+        nodes.append({
+            'number': len(nodes),
+            'title': f'Issue number {len(nodes)} with a title',
+            'closed': len(nodes) % 3 == 0,
+            'score': len(nodes) / 7,
+            'author': {'login': f'user{len(nodes) % 100}'},
+            'labels': ['bug', 'performance']
+        })
+
+        if node_size == 0:
+            node_size = len(json.dumps(nodes[0]))
+
+    return response
+
+
+def json_round_trip(response):
+    json_data = json.dumps(response, ensure_ascii=False, indent=4)
+
+    return yaml.dump(yaml.load(json_data, Loader=yaml.Loader),
+                     allow_unicode=True,
+                     sort_keys=False,
+                     Dumper=yaml.Dumper)
+
+
+def direct(response):
+    return yaml.dump(response,
+                     allow_unicode=True,
+                     sort_keys=False,
+                     Dumper=YAML_DUMPER)
+
+
+def streaming(response):
+    data = json.dumps(response).encode('utf-8')
+    events = iter_events(data[i:i + 65536] for i in range(0, len(data), 65536))
+    stream = io.StringIO()
+    write_yaml(events, *next(events), stream)
+
+    return stream.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare YAML output throughput.')
+    parser.add_argument('--size',
+                        type=float,
+                        default=50,
+                        help='Response size in MB (default: %(default)s).')
+    parser.add_argument('--skip-round-trip',
+                        action='store_true',
+                        help='Skip the slow JSON to YAML round trip.')
+    args = parser.parse_args()
+
+    response = create_response(int(args.size * 1_000_000))
+    size = len(json.dumps(response)) / 1_000_000
+    print(f'Response size: {size:.1f} MB')
+    print(f'YAML dumper: {YAML_DUMPER.__name__}')
+    functions = [direct, streaming]
+
+    if not args.skip_round_trip:
+        functions.insert(0, json_round_trip)
+
+    for function in functions:
+        start_time = time.perf_counter()
+        function(response)
+        elapsed = time.perf_counter() - start_time
+        print(f'{function.__name__:16} {elapsed:8.2f} s {size / elapsed:8.2f} MB/s')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
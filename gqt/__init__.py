@@ -1,10 +1,13 @@
 import argparse
+import copy
+import fnmatch
 import json
 import logging
 import os
 import shutil
 import subprocess
 import sys
+import time
 
 import requests
 import yaml
@@ -14,15 +17,77 @@ from graphql.language import parse
 from graphql.language import print_ast
 from tabulate import tabulate
 
+from .aggregate import Aggregator
+from .aggregate import parse_aggregate
+from .batch import read_variables
+from .batch import run_batch
+from .batch import run_named
+from .bench import format_report
+from .bench import run_bench
+from .bulk import Checkpoint
+from .bulk import OverloadedError
+from .bulk import get_variable_types
+from .bulk import read_rows
+from .bulk import run_bulk
+from .cache import DEFAULT_TTL
+from .cache import ResponseCache
+from .cache import create_key
+from .cache import execute_cached
+from .codec import dumps
+from .codec import dumps_pretty
+from .codec import loads
+from .dashboard import QueryState
+from .dashboard import run_dashboard
+from .database import add_persisted_query
 from .database import clear_database
 from .database import get_queries
+from .database import get_query_names
+from .database import make_query_json_path
+from .database import read_cache_ttl
+from .database import read_persisted_queries
 from .database import read_tree_from_database
+from .database import remove_persisted_query
+from .database import write_cache_ttl
+from .document import is_query_operation
 from .endpoint import create_query
 from .endpoint import fetch_schema
-from .endpoint import post
+from .endpoint import iter_body
+from .endpoint import make_transport
+from .entities import EntityStore
+from .entities import execute_entity_cached
+from .entities import make_store_path
+from .export import EXPORTERS
+from .export import export
+from .highlight import HighlightingWriter
+from .highlight import highlight
+from .merge import merge_queries
+from .paginate import create_pagination
+from .paginate import paginate
+from .persisted import create_manifest
+from .persisted import execute_persisted_query
+from .persisted import query_hash
 from .query_builder import QuitError
 from .query_builder import query_builder
+from .retry import DEFAULT_CONNECT_TIMEOUT
+from .retry import DEFAULT_READ_TIMEOUT
+from .retry import DEFAULT_RETRIES
+from .retry import RetryPolicy
+from .retry import is_query_text
+from .retry import parse_retry_after
+from .select import parse_select
+from .select import select_events
+from .shard import create_sharding
+from .shard import fetch_shards
+from .stream import ErrorsScanner
+from .stream import YAML_DUMPER
+from .stream import iter_events
+from .stream import parse_response
+from .stream import write_json
+from .stream import write_yaml
+from .table import CsvWriter
+from .table import SqliteWriter
 from .version import __version__
+from .watch import watch
 
 
 def default_endpoint():
@@ -41,42 +106,471 @@ def last_query(endpoint, query_name):
         sys.exit(message)
 
 
-def execute_query(endpoint, query, headers, verify):
-    response = post(endpoint, query, headers, verify).json()
-    errors = response.get('errors')
-
+def exit_on_errors(errors):
     if errors is not None:
         for error in errors:
             print('error:', error['message'], file=sys.stderr)
 
         sys.exit(1)
 
+
+def execute_query(transport, query):
+    response = transport.execute(query)
+    exit_on_errors(response.get('errors'))
+
     return response['data']
 
 
-def style_response(response, format_yaml):
-    json_data = json.dumps(response, ensure_ascii=False, indent=4)
+def execute_query_cached(transport, query, variables, ttl, read):
+    def fetch(cache_headers):
+        return transport.post(create_query(query, variables), headers=cache_headers)
+
+    response = execute_cached(fetch,
+                              ResponseCache(),
+                              create_key(transport.endpoint,
+                                         query,
+                                         variables,
+                                         transport.headers),
+                              ttl,
+                              read)
+    exit_on_errors(response.get('errors'))
+
+    return response['data']
+
+
+def execute_query_entity_cached(transport, query, variables, schema, ttl):
+    def fetch(query, variables):
+        return transport.post(create_query(query, variables))
+
+    store = EntityStore(build_client_schema(schema),
+                        make_store_path(transport.endpoint, transport.headers))
+    response = execute_entity_cached(fetch, store, query, variables, ttl)
+    exit_on_errors(response.get('errors'))
+
+    return response['data']
+
+
+def execute_query_persisted(transport, query, variables):
+    endpoint = transport.endpoint
+    persisted_queries = read_persisted_queries(endpoint)
+    # Requests with only the hash are sent as GET too, as long as the
+    # operation is a query.
+    get = is_query_operation(query)
+
+    def fetch(query):
+        return loads(transport.post(query, get=get).content)
+
+    sha256_hash = query_hash(query)
+    response, accepted = execute_persisted_query(fetch, query, variables)
+
+    if accepted:
+        if sha256_hash not in persisted_queries:
+            add_persisted_query(endpoint, sha256_hash, query)
+    elif sha256_hash in persisted_queries:
+        remove_persisted_query(endpoint, sha256_hash)
+
+    exit_on_errors(response.get('errors'))
+
+    return response['data']
+
+
+def print_persisted_manifest(endpoint):
+    queries = list(read_persisted_queries(endpoint).values())
+
+    for query_name in [None, *get_query_names(endpoint)]:
+        if make_query_json_path(endpoint, query_name).exists():
+            queries.append(read_tree_from_database(endpoint, query_name).query())
+
+    print(dumps_pretty(create_manifest(queries)))
+
+
+def execute_query_stream(transport, query, format_yaml, color):
+    response = transport.post(query, stream=True)
+    events = iter_events(iter_body(response, transport.policy))
 
     if format_yaml:
-        return yaml.dump(yaml.load(json_data, Loader=yaml.Loader),
+        language = 'yaml'
+    else:
+        language = 'json'
+
+    if use_color(color, sys.stdout):
+        output = HighlightingWriter(sys.stdout, language)
+    else:
+        output = sys.stdout
+
+    def write_data(events, event, value):
+        if format_yaml:
+            write_yaml(events, event, value, output)
+        else:
+            write_json(events, event, value, output.write)
+            output.write('\n')
+
+        output.flush()
+
+    exit_on_errors(parse_response(events, write_data))
+
+
+def execute_query_select(transport, query, steps, emit):
+    response = transport.post(query, stream=True)
+    events = iter_events(iter_body(response, transport.policy))
+
+    def select_data(events, event, value):
+        select_events(events, event, value, steps, emit)
+
+    exit_on_errors(parse_response(events, select_data))
+
+
+def make_select_printer(format_yaml, color):
+    def emit(value):
+        if format_yaml:
+            show(style_response([value], True), 'yaml', color)
+        else:
+            show(style_response(value, False), 'json', color)
+
+    return emit
+
+
+def create_table_writer(args):
+    if args.csv:
+        return CsvWriter(sys.stdout, ',')
+    elif args.tsv:
+        return CsvWriter(sys.stdout, '\t')
+    elif args.sqlite is not None:
+        return SqliteWriter(args.sqlite, args.sqlite_table)
+    else:
+        return None
+
+
+def execute_query_paginated(transport, query, variables, path, limit, prefetch):
+    pagination = create_pagination(query, path, variables)
+
+    def fetch(variables):
+        return execute_query(transport, create_query(pagination.query, variables))
+
+    for item in paginate(fetch, pagination, variables, limit, prefetch):
+        sys.stdout.write(dumps(item) + '\n')
+
+
+def execute_query_sharded(transport,
+                          query,
+                          variables,
+                          path,
+                          number_of_shards,
+                          workers):
+    sharding = create_sharding(query, path, variables)
+
+    def fetch(variables):
+        return execute_query(transport, create_query(sharding.query, variables))
+
+    return fetch_shards(fetch, sharding, variables, number_of_shards, workers)
+
+
+def create_policy(args):
+    return RetryPolicy(args.connect_timeout,
+                       args.read_timeout,
+                       args.retries,
+                       args.deadline,
+                       args.idempotent)
+
+
+def create_transport(args, headers, verify, policy):
+    return make_transport(args.endpoint,
+                          headers,
+                          verify,
+                          args.workers,
+                          args.max_batch_size,
+                          args.linger / 1000,
+                          args.compress,
+                          policy,
+                          args.get,
+                          args.verbose)
+
+
+def execute_query_batch(transport, query, path, workers, rate, ordered):
+    def execute(variables):
+        try:
+            return transport.execute(create_query(query, variables))
+        except Exception as error:
+            return {'errors': [{'message': str(error)}]}
+
+    def emit(index, result):
+        if not ordered:
+            result['index'] = index
+
+        sys.stdout.write(dumps(result) + '\n')
+
+    if path == '-':
+        run_batch(execute, read_variables(sys.stdin), workers, rate, ordered, emit)
+    else:
+        with open(path, encoding='utf-8') as fin:
+            run_batch(execute, read_variables(fin), workers, rate, ordered, emit)
+
+
+def execute_query_bulk(transport, query, path, checkpoint_path, workers, policy):
+    # Requests are retried by run_bulk using policy, not by the
+    # transport.
+    def execute(variables):
+        try:
+            response = transport.post(create_query(query, variables))
+        except requests.exceptions.HTTPError as error:
+            status_code = error.response.status_code
+
+            if status_code == 429 or status_code >= 500:
+                raise OverloadedError(
+                    f'HTTP status {status_code}.',
+                    parse_retry_after(error.response.headers.get('Retry-After')))
+
+            raise
+        except requests.exceptions.RequestException as error:
+            raise OverloadedError(str(error))
+
+        return loads(response.content)
+
+    counts = {
+        'completed': 0,
+        'errors': 0,
+        'failed': 0
+    }
+
+    def emit(row_number, result, error):
+        if error is not None:
+            counts['failed'] += 1
+            result = {'errors': [{'message': str(error)}]}
+        elif 'errors' in result:
+            counts['errors'] += 1
+        else:
+            counts['completed'] += 1
+
+            return
+
+        sys.stdout.write(dumps({'row': row_number, **result}) + '\n')
+        sys.stdout.flush()
+
+    if checkpoint_path is None:
+        checkpoint_path = path + '.checkpoint'
+
+    checkpoint = Checkpoint(checkpoint_path)
+
+    with open(path, newline='') as fin:
+        rows = read_rows(fin, get_variable_types(query))
+
+        try:
+            run_bulk(execute,
+                     rows,
+                     workers,
+                     checkpoint,
+                     emit,
+                     policy,
+                     policy.idempotent or is_query_text(query))
+        finally:
+            print(f"{counts['completed']} rows completed, {counts['errors']} with "
+                  f"errors and {counts['failed']} failed. Failed rows are retried "
+                  f"when resumed from '{checkpoint_path}'.",
+                  file=sys.stderr)
+
+
+def execute_query_bench(transport,
+                        query,
+                        iterations,
+                        duration,
+                        workers,
+                        output_json,
+                        batched):
+    def execute():
+        try:
+            response = transport.post(query)
+        except requests.exceptions.HTTPError as error:
+            raise Exception(f'HTTP status {error.response.status_code}')
+        except requests.exceptions.RequestException as error:
+            raise Exception(type(error).__name__)
+
+        if response.status_code != 200:
+            raise Exception(f'HTTP status {response.status_code}')
+
+        scanner = ErrorsScanner()
+        scanner.feed(response.content)
+
+        return len(response.content), scanner.has_errors
+
+    def execute_batched():
+        # Sizes are of the re-encoded responses, as batched responses
+        # arrive together.
+        try:
+            response = transport.execute(query)
+        except requests.exceptions.HTTPError as error:
+            raise Exception(f'HTTP status {error.response.status_code}')
+        except requests.exceptions.RequestException as error:
+            raise Exception(type(error).__name__)
+
+        return len(dumps(response).encode('utf-8')), 'errors' in response
+
+    if batched:
+        execute = execute_batched
+
+    report = run_bench(execute, iterations, duration, workers).report()
+
+    if output_json:
+        print(dumps_pretty(report))
+    else:
+        print(format_report(report))
+
+
+def execute_query_watch(transport, query, interval, format_yaml, color):
+    etag = None
+
+    def fetch():
+        nonlocal etag
+
+        headers = {}
+
+        if etag is not None:
+            headers['If-None-Match'] = etag
+
+        try:
+            response = transport.post(query, headers=headers)
+        except requests.exceptions.RequestException as error:
+            print(f'error: {error}', file=sys.stderr)
+
+            return None
+
+        if response.status_code == 304:
+            return None
+
+        etag = response.headers.get('ETag')
+
+        return loads(response.content)
+
+    failed = False
+
+    def show_first(data):
+        if format_yaml:
+            show(style_response(data, True), 'yaml', color)
+        else:
+            show(style_response(data, False), 'json', color)
+
+    def show_diff(text):
+        show(f"# {time.strftime('%Y-%m-%d %H:%M:%S')}\n{text}", 'diff', color)
+
+    def show_errors(errors):
+        nonlocal failed
+
+        for error in errors:
+            print('error:', error['message'], file=sys.stderr)
+
+        failed = bool(errors)
+
+    # Exits with status 1 when stopped if the last response had errors.
+    try:
+        watch(fetch, interval, show_first, show_diff, show_errors)
+    except KeyboardInterrupt:
+        sys.exit(int(failed))
+
+
+def execute_dashboard(transport, query_names, variables, interval, workers):
+    endpoint = transport.endpoint
+    states = []
+
+    for query_name in query_names:
+        if not make_query_json_path(endpoint, query_name).exists():
+            raise Exception(f"No query named '{query_name}' found.")
+
+        query = read_tree_from_database(endpoint, query_name).query()
+        query = create_query(query, variables)
+
+        def fetch(query=query):
+            return loads(transport.post(query).content)
+
+        states.append(QueryState(query_name, fetch))
+
+    run_dashboard(endpoint, states, interval, workers)
+
+
+def is_query_name_pattern(query_name):
+    return any(character in query_name for character in '*?[')
+
+
+def expand_query_names(endpoint, patterns):
+    saved_query_names = get_query_names(endpoint)
+    query_names = []
+
+    for pattern in patterns:
+        if is_query_name_pattern(pattern):
+            matches = fnmatch.filter(saved_query_names, pattern)
+        elif pattern in saved_query_names:
+            matches = [pattern]
+        else:
+            matches = []
+
+        if not matches:
+            raise Exception(f"No query named '{pattern}' found.")
+
+        for query_name in matches:
+            if query_name not in query_names:
+                query_names.append(query_name)
+
+    return query_names
+
+
+def execute_named_queries(transport, query_names, variables, workers, fail_fast):
+    def execute(query_name):
+        query = read_tree_from_database(transport.endpoint, query_name).query()
+
+        try:
+            return transport.execute(create_query(query, variables))
+        except requests.exceptions.RequestException as error:
+            return {'errors': [{'message': str(error)}]}
+
+    return run_named(execute, query_names, workers, fail_fast)
+
+
+def execute_merged_queries(transport, query_names, variables):
+    merged_query = merge_queries(
+        [
+            (query_name,
+             read_tree_from_database(transport.endpoint, query_name).query())
+            for query_name in query_names
+        ],
+        variables)
+    response = transport.post(create_query(merged_query.query,
+                                           merged_query.variables))
+
+    return merged_query.split(loads(response.content))
+
+
+def execute_query_raw(transport, query, output_fd):
+    response = transport.post(query, stream=True)
+    scanner = ErrorsScanner()
+
+    with os.fdopen(output_fd, 'wb', closefd=False) as fout:
+        for chunk in iter_body(response, transport.policy):
+            fout.write(chunk)
+            scanner.feed(chunk)
+
+    if scanner.has_errors:
+        sys.exit('error: The response contains errors.')
+
+
+def style_response(response, format_yaml):
+    if format_yaml:
+        return yaml.dump(response,
                          allow_unicode=True,
                          sort_keys=False,
-                         Dumper=yaml.Dumper).strip()
+                         Dumper=YAML_DUMPER).strip()
     else:
-        return json_data
+        return dumps_pretty(response)
 
 
-CURL_COMMAND = '''\
-curl -X POST \\
-     -H 'content-type: application/json' \\
-{headers}\
-     '{endpoint}' \\
-     -d '{query}'\
-'''
+def use_color(color, stream):
+    return color or ('NO_COLOR' not in os.environ and stream.isatty())
 
 
 def show(data, language, color=False, to_stderr=False):
-    if 'GQT_NO_BAT' not in os.environ and shutil.which('bat'):
+    if to_stderr:
+        stream = sys.stderr
+    else:
+        stream = sys.stdout
+
+    if 'GQT_BAT' in os.environ and shutil.which('bat'):
         data += '\n'
         command = f'bat -p -l {language}'
 
@@ -86,11 +580,12 @@ def show(data, language, color=False, to_stderr=False):
         if to_stderr:
             command += ' 1>&2'
 
+        stream.flush()
         subprocess.run(command, input=data, shell=True, text=True)
-    elif to_stderr:
-        print(data, file=sys.stderr)
+    elif use_color(color, stream):
+        print(highlight(data, language), file=stream)
     else:
-        print(data)
+        print(data, file=stream)
 
 
 def make_headers(headers_list):
@@ -106,16 +601,6 @@ def make_headers(headers_list):
     return headers
 
 
-def make_curl_headers(headers_list):
-    if not headers_list:
-        return ''
-
-    return '\n'.join([
-        f"     -H '{header}' \\"
-        for header in headers_list
-    ]) + '\n'
-
-
 def create_variables(variables):
     result = {}
 
@@ -138,13 +623,33 @@ def create_variables(variables):
     return result
 
 
+def positive_float(value):
+    value = float(value)
+
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"'{value:g}' is not positive.")
+
+    return value
+
+
+def positive_int(value):
+    value = int(value)
+
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"'{value}' is not positive.")
+
+    return value
+
+
 def list_queries():
     print(tabulate(get_queries(), ('Endpoint', 'Query name')))
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Set GQT_NO_BAT to disable using bat for styling.')
+        description=('Output is highlighted when written to a terminal. Set '
+                     'GQT_BAT to use bat for styling instead, or NO_COLOR to '
+                     'disable highlighting.'))
     parser.add_argument('--version',
                         action='version',
                         version=__version__,
@@ -154,8 +659,21 @@ def main():
         default=default_endpoint(),
         help=('GraphQL endpoint. Environment variable '
               'GQT_ENDPOINT is used as default value.'))
-    parser.add_argument('-n', '--query-name',
-                        help='Query name.')
+    parser.add_argument(
+        '-n', '--query-name',
+        action='append',
+        help=('Query name. Give more than once, or as a glob pattern, to '
+              'execute several saved queries concurrently, using --workers '
+              'concurrent requests, and print their responses keyed by name.'))
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help=('Merge several named queries into one request by aliasing their '
+              'root fields, instead of executing them concurrently.'))
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop at the first of several named queries that fails.')
     parser.add_argument(
         '-v', '--variable',
         action='append',
@@ -167,12 +685,254 @@ def main():
     parser.add_argument('-y', '--yaml',
                         action='store_true',
                         help='Print the response as YAML instead of JSON.')
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help=('Print the response while it is received instead of after '
+              'it has been received. Uses less memory for large responses.'))
+    parser.add_argument(
+        '--raw',
+        action='store_true',
+        help=('Write the response body as received, without decoding and '
+              'styling it. Exits with an error if it contains errors.'))
+    parser.add_argument('--output-fd',
+                        type=int,
+                        default=1,
+                        help='File descriptor to write raw output to (default: 1).')
+    parser.add_argument(
+        '-s', '--select',
+        help=('Only print values matching given expression, for example '
+              'repository.issues.nodes[*].title or '
+              'items[?state == "OPEN"].title. Each matching value is '
+              'printed while the response is received.'))
+    parser.add_argument(
+        '--csv',
+        action='store_true',
+        help=('Print values selected with --select as CSV rows. Nested '
+              'fields are given dotted column names. Columns are taken from '
+              'the first 1000 rows, and other columns are dropped with a '
+              'warning.'))
+    parser.add_argument('--tsv',
+                        action='store_true',
+                        help='Like --csv, but tab separated.')
+    parser.add_argument(
+        '--sqlite',
+        metavar='FILE',
+        help='Insert values selected with --select as rows into given SQLite file.')
+    parser.add_argument('--sqlite-table',
+                        default='rows',
+                        help='SQLite table name (default: %(default)s).')
+    parser.add_argument(
+        '-a', '--aggregate',
+        action='append',
+        default=[],
+        help=('Aggregate values selected with --select instead of printing '
+              'them, given as <operation>[:<field>]. Operation is count, sum, '
+              'min, max, mean or p<percentile>, for example p99. May be given '
+              'multiple times.'))
+    parser.add_argument('--group-by',
+                        metavar='FIELD',
+                        help='Aggregate per distinct value of given field.')
+    parser.add_argument(
+        '--paginate',
+        metavar='PATH',
+        help=('Fetch all pages of the connection at given path, for example '
+              'repository.issues, and print its edges or nodes as JSON '
+              'Lines. The after argument and pageInfo are added to the query '
+              'as needed.'))
+    parser.add_argument('--limit',
+                        type=int,
+                        help='Maximum number of items to fetch when paginating.')
+    parser.add_argument('--prefetch',
+                        action='store_true',
+                        help='Fetch the next page while printing the current page.')
+    parser.add_argument(
+        '--shard',
+        metavar='PATH',
+        help=('Split the range given by the offset (or skip) and limit (or '
+              'first) arguments of the list field at given path into shards, '
+              'fetch them concurrently and merge them in order.'))
+    parser.add_argument('--shards',
+                        type=positive_int,
+                        default=8,
+                        help='Number of shards (default: %(default)s).')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Maximum number of concurrent requests (default: %(default)s).')
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help=('Execute the query once per JSON object of variables in given '
+              'JSON Lines file, or - for stdin, and print one response per '
+              'line in input order. Uses --workers concurrent requests.'))
+    parser.add_argument('--rate',
+                        type=positive_float,
+                        help='Maximum number of requests per second.')
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help=('Print batch responses as they complete, with an index member '
+              'giving the input line number.'))
+    parser.add_argument(
+        '--bulk',
+        metavar='CSV',
+        help=('Execute the query once per row in given CSV file, with columns '
+              'named after the variables. Concurrency adapts to latency and '
+              'server overload, up to --workers concurrent requests. '
+              'Overloaded requests are retried as given by --retries and '
+              '--idempotent. Progress '
+              'is saved in a checkpoint file, from which an interrupted run '
+              'resumes. Rows with errors are printed as JSON Lines.'))
+    parser.add_argument(
+        '--checkpoint',
+        metavar='FILE',
+        help='Bulk checkpoint file (default: <CSV>.checkpoint).')
+    parser.add_argument(
+        '--bench',
+        action='store_true',
+        help=('Execute the query repeatedly using --workers concurrent '
+              'requests and print throughput, latency percentiles, error '
+              'counts and response sizes.'))
+    parser.add_argument('--iterations',
+                        type=int,
+                        default=100,
+                        help='Number of bench requests (default: %(default)s).')
+    parser.add_argument(
+        '--duration',
+        type=float,
+        help='Bench for given number of seconds instead of --iterations.')
+    parser.add_argument('--json',
+                        action='store_true',
+                        help='Print the bench report as JSON.')
+    parser.add_argument(
+        '--watch',
+        type=float,
+        metavar='SECONDS',
+        help=('Execute the query every given number of seconds, with some '
+              'jitter, and print what changed in the response. Nothing is '
+              'printed when it is unchanged.'))
+    parser.add_argument(
+        '--dashboard',
+        nargs='+',
+        metavar='NAME',
+        help=('Show a live dashboard of the values of given named queries, '
+              'executed every --interval seconds using --workers concurrent '
+              'requests.'))
+    parser.add_argument('--interval',
+                        type=float,
+                        default=2,
+                        help='Dashboard refresh interval (default: %(default)s).')
+    parser.add_argument(
+        '--max-batch-size',
+        type=int,
+        help=('Send up to given number of concurrent --batch, --bench or named '
+              'query executions as one JSON array per request. Falls back to '
+              'one execution per request if the server does not accept '
+              'arrays.'))
+    parser.add_argument(
+        '--linger',
+        type=float,
+        default=5,
+        metavar='MS',
+        help=('Maximum time in milliseconds to wait for more executions to '
+              'add to a JSON array (default: %(default)s).'))
+    parser.add_argument(
+        '--persisted',
+        action='store_true',
+        help=('Use automatic persisted queries, sending the SHA-256 hash of '
+              'the query, and the query text only if the hash is not '
+              'accepted.'))
+    parser.add_argument(
+        '--persisted-manifest',
+        action='store_true',
+        help=('Print the SHA-256 hash to query manifest of all saved and '
+              'persisted queries of the endpoint, for server allow-listing.'))
+    parser.add_argument(
+        '--get',
+        action='store_true',
+        help=('Send queries, but never mutations, as GET requests, so that '
+              'HTTP caches can serve them. Long queries are sent as POST.'))
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help=('Print the method, status, time, sizes and cache headers of '
+              'each request to standard error. The received size is left out '
+              'with --stream, --raw and --select.'))
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help=('Gzip compress request bodies of at least 1 kB. Compressed '
+              'responses are always accepted.'))
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        metavar='SECONDS',
+        help='Connect timeout of each request (default: %(default)s).')
+    parser.add_argument(
+        '--read-timeout',
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        metavar='SECONDS',
+        help=('Timeout waiting for data from the server in each request '
+              '(default: %(default)s).'))
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=('Number of retries of queries failing with connection errors, '
+              'timeouts or HTTP status 408, 429, 500, 502, 503 or 504, with '
+              'jittered exponential backoff or as given by Retry-After, '
+              'unless it is over two minutes (default: %(default)s).'))
+    parser.add_argument(
+        '--idempotent',
+        action='store_true',
+        help='Retry mutations as well, as they are safe to repeat.')
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        metavar='SECONDS',
+        help=('Fail if not done within given time. Timeouts are shortened '
+              'and retries skipped to meet it.'))
+    parser.add_argument(
+        '--cached',
+        action='store_const',
+        const=True,
+        dest='cache',
+        help=('Use the cached response of the query, if fresh, and cache new '
+              'responses. Mutations are never cached.'))
+    parser.add_argument('--no-cache',
+                        action='store_const',
+                        const=False,
+                        dest='cache',
+                        help='Do not use a cached response, but cache the new one.')
+    parser.add_argument(
+        '--entity-cache',
+        action='store_true',
+        help=('Cache response objects by __typename and id, and fetch only '
+              'fields of the query that are not fresh in the cache.'))
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        metavar='SECONDS',
+        help=('Time to cache responses and objects of the query without a '
+              'Cache-Control max-age. Remembered per query '
+              f'(default: {DEFAULT_TTL}).'))
     parser.add_argument('-q', '--print-query',
                         action='store_true',
                         help='Print the query instead of executing it.')
     parser.add_argument('-c', '--print-curl',
-                        action='store_true',
+                        action='store_const',
+                        const='curl',
+                        dest='export',
                         help='Print the cURL command instead of executing it.')
+    parser.add_argument(
+        '--export',
+        choices=sorted(EXPORTERS),
+        help=('Print a cURL command, a k6 or wrk script, or a vegeta JSON '
+              'target executing the query instead of executing it.'))
     parser.add_argument('-p', '--print-schema',
                         action='store_true',
                         help='Print the schema.')
@@ -206,31 +966,156 @@ def main():
         list_queries()
         return
 
+    if args.raw and (args.stream or args.yaml or args.select):
+        sys.exit('Raw output cannot be combined with --stream, --yaml or --select.')
+
+    if (args.csv or args.tsv or args.sqlite or args.aggregate) and args.select is None:
+        sys.exit('--csv, --tsv, --sqlite and --aggregate require --select, for '
+                 'example --select "items[*]".')
+
+    modes = [
+        args.batch is not None,
+        args.bulk is not None,
+        args.bench,
+        args.watch is not None
+    ]
+
+    if sum(modes) > 1:
+        sys.exit('--batch, --bulk, --bench and --watch cannot be combined.')
+
+    if any(modes) and (args.select
+                       or args.raw
+                       or args.stream
+                       or args.paginate
+                       or args.shard):
+        sys.exit('--batch, --bulk, --bench and --watch cannot be combined with '
+                 '--select, --raw, --stream, --paginate or --shard.')
+
+    if args.dashboard and args.verbose:
+        sys.exit('--verbose cannot be combined with --dashboard.')
+
+    if args.cache is not None and args.persisted:
+        sys.exit('--cached and --no-cache cannot be combined with --persisted.')
+
+    if args.entity_cache and (args.cache is not None or args.persisted):
+        sys.exit('--entity-cache cannot be combined with --cached, --no-cache '
+                 'or --persisted.')
+
+    query_names = args.query_name or [None]
+
+    if len(query_names) == 1 and not is_query_name_pattern(query_names[0] or ''):
+        args.query_name = query_names[0]
+        query_names = None
+
+        if args.merge:
+            sys.exit('--merge requires several query names.')
+    elif (any(modes)
+          or args.select
+          or args.raw
+          or args.stream
+          or args.paginate
+          or args.shard
+          or args.export
+          or args.print_query
+          or args.dashboard):
+        sys.exit('Several query names can only be executed and printed as JSON '
+                 'or YAML.')
+
     logging.captureWarnings(True)
     verify = not args.no_verify
+    policy = create_policy(args)
+    transport = create_transport(args, headers, verify, policy)
 
     try:
+        if args.select is not None:
+            select_steps = parse_select(args.select)
+            aggregates = [
+                parse_aggregate(aggregate) for aggregate in args.aggregate
+            ]
+
         if args.endpoint is None:
             raise Exception("No endpoint given via --endpoint or environment variable GQT_ENDPOINT.")
 
-        if args.print_schema:
+        if args.persisted_manifest:
+            print_persisted_manifest(args.endpoint)
+        elif args.print_schema:
             schema = print_schema(
                 build_client_schema(
-                    fetch_schema(args.endpoint, headers, verify)))
+                    fetch_schema(args.endpoint,
+                                 headers,
+                                 verify,
+                                 args.compress,
+                                 policy)))
             show(schema, 'graphql', args.color)
+        elif args.dashboard:
+            execute_dashboard(transport,
+                              args.dashboard,
+                              create_variables(args.variable),
+                              args.interval,
+                              args.workers)
+        elif query_names is not None:
+            query_names = expand_query_names(args.endpoint, query_names)
+            variables = create_variables(args.variable)
+
+            if args.merge:
+                responses = execute_merged_queries(transport, query_names, variables)
+            else:
+                responses = execute_named_queries(transport,
+                                                  query_names,
+                                                  variables,
+                                                  args.workers,
+                                                  args.fail_fast)
+
+            data = {
+                query_name: response.get('data')
+                for query_name, response in responses.items()
+            }
+
+            if args.yaml:
+                show(style_response(data, True), 'yaml', args.color)
+            else:
+                show(style_response(data, False), 'json', args.color)
+
+            failed = False
+
+            for query_name, response in responses.items():
+                for error in response.get('errors') or []:
+                    print(f"error: {query_name}: {error['message']}", file=sys.stderr)
+                    failed = True
+
+            if failed:
+                sys.exit(1)
         else:
             variables = create_variables(args.variable)
 
             if args.repeat:
                 query = last_query(args.endpoint, args.query_name)
             else:
+                # The deadline does not include time spent building the
+                # query, so the schema may be fetched at any time.
                 query = query_builder(args.endpoint,
                                       args.query_name,
                                       headers,
                                       verify,
-                                      list(variables.keys()))
+                                      list(variables.keys()),
+                                      args.compress,
+                                      RetryPolicy(args.connect_timeout,
+                                                  args.read_timeout,
+                                                  args.retries))
+                policy = create_policy(args)
+                transport.policy = policy
 
+            schema = query.schema()
             query = query.query()
+            cache_ttl = args.cache_ttl
+
+            if cache_ttl is None:
+                cache_ttl = read_cache_ttl(args.endpoint, args.query_name)
+
+                if cache_ttl is None:
+                    cache_ttl = DEFAULT_TTL
+            else:
+                write_cache_ttl(args.endpoint, args.query_name, cache_ttl)
 
             if args.print_query:
                 print('Query:')
@@ -238,16 +1123,109 @@ def main():
                 print()
                 print('Variables:')
                 show(json.dumps(variables, indent=4), 'json', args.color)
-            elif args.print_curl:
-                query = json.dumps(create_query(query, variables))
-                print(CURL_COMMAND.format(endpoint=args.endpoint,
-                                          query=query,
-                                          headers=make_curl_headers(args.header)))
-            else:
-                response = execute_query(args.endpoint,
+            elif args.export is not None:
+                print(export(args.export,
+                             args.endpoint,
+                             create_query(query, variables),
+                             headers))
+            elif args.watch is not None:
+                execute_query_watch(transport,
+                                    create_query(query, variables),
+                                    args.watch,
+                                    args.yaml,
+                                    args.color)
+            elif args.bench:
+                # Failures are measured, not retried.
+                policy.retries = 0
+                execute_query_bench(transport,
+                                    create_query(query, variables),
+                                    args.iterations,
+                                    args.duration,
+                                    args.workers,
+                                    args.json,
+                                    args.max_batch_size is not None)
+            elif args.bulk is not None:
+                # Overloaded requests are retried by run_bulk, which also
+                # adapts the concurrency.
+                bulk_policy = copy.copy(policy)
+                policy.retries = 0
+                execute_query_bulk(transport,
+                                   query,
+                                   args.bulk,
+                                   args.checkpoint,
+                                   args.workers,
+                                   bulk_policy)
+            elif args.batch is not None:
+                execute_query_batch(transport,
+                                    query,
+                                    args.batch,
+                                    args.workers,
+                                    args.rate,
+                                    not args.unordered)
+            elif args.paginate is not None:
+                execute_query_paginated(transport,
+                                        query,
+                                        variables,
+                                        args.paginate,
+                                        args.limit,
+                                        args.prefetch)
+            elif args.select is not None:
+                table_writer = create_table_writer(args)
+                aggregator = None
+
+                if aggregates:
+                    aggregator = Aggregator(aggregates, args.group_by)
+                    emit = aggregator.add
+                elif table_writer is None:
+                    emit = make_select_printer(args.yaml, args.color)
+                else:
+                    emit = table_writer.write
+
+                try:
+                    execute_query_select(transport,
                                          create_query(query, variables),
-                                         headers,
-                                         verify)
+                                         select_steps,
+                                         emit)
+                finally:
+                    if table_writer is not None:
+                        table_writer.close()
+
+                if aggregator is not None:
+                    print(aggregator.format())
+            elif args.raw:
+                execute_query_raw(transport,
+                                  create_query(query, variables),
+                                  args.output_fd)
+            elif args.stream:
+                execute_query_stream(transport,
+                                     create_query(query, variables),
+                                     args.yaml,
+                                     args.color)
+            else:
+                if args.shard is not None:
+                    response = execute_query_sharded(transport,
+                                                     query,
+                                                     variables,
+                                                     args.shard,
+                                                     args.shards,
+                                                     args.workers)
+                elif args.entity_cache and is_query_operation(query):
+                    response = execute_query_entity_cached(transport,
+                                                           query,
+                                                           variables,
+                                                           schema,
+                                                           cache_ttl)
+                elif args.cache is not None and is_query_operation(query):
+                    response = execute_query_cached(transport,
+                                                    query,
+                                                    variables,
+                                                    cache_ttl,
+                                                    args.cache)
+                elif args.persisted:
+                    response = execute_query_persisted(transport, query, variables)
+                else:
+                    response = execute_query(transport, create_query(query, variables))
+
                 response = style_response(response, args.yaml)
 
                 if args.yaml:
@@ -273,3 +1251,5 @@ def main():
         sys.exit(f'error: {error}')
     except BaseException as error:
         sys.exit(f'error: {error}')
+    finally:
+        transport.close()
@@ -0,0 +1,207 @@
+import math
+import re
+from array import array
+
+from tabulate import tabulate
+
+AGGREGATE_RE = re.compile(r'(count|sum|min|max|mean|p(\d+(?:\.\d+)?))(?::(.+))?$')
+
+
+class Aggregate:
+
+    def __init__(self, operation, percentile, field):
+        self.operation = operation
+        self.percentile = percentile
+        self.field = field
+
+    def name(self):
+        if self.field is None:
+            return self.operation
+        else:
+            return f'{self.operation}({".".join(self.field)})'
+
+
+def parse_aggregate(text):
+    match = AGGREGATE_RE.match(text)
+
+    if match is None:
+        raise Exception(
+            f"Invalid aggregate '{text}'. Expected <operation>[:<field>], where "
+            f"operation is count, sum, min, max, mean or p<percentile>.")
+
+    operation, percentile, field = match.groups()
+
+    if percentile is not None:
+        percentile = float(percentile)
+
+        if percentile > 100:
+            raise Exception(f"Invalid percentile '{operation}'.")
+
+    if field is not None:
+        field = tuple(field.split('.'))
+
+    return Aggregate(operation, percentile, field)
+
+
+def get_field(value, field):
+    if field is None:
+        return value
+
+    for key in field:
+        if not isinstance(value, dict):
+            return None
+
+        value = value.get(key)
+
+    return value
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class FieldStatistics:
+
+    def __init__(self, keep_values):
+        self.count = 0
+        self.number_count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+        # Doubles in an array use a fraction of the memory of a list
+        # of floats.
+        if keep_values:
+            self.values = array('d')
+        else:
+            self.values = None
+
+        self._sorted = True
+
+    def add(self, value):
+        if value is None:
+            return
+
+        self.count += 1
+
+        if not is_number(value):
+            return
+
+        self.number_count += 1
+        self.total += value
+
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+        if self.values is not None:
+            self.values.append(value)
+            self._sorted = False
+
+    def percentile(self, percentile):
+        if not self.values:
+            return None
+
+        if not self._sorted:
+            self.values = array('d', sorted(self.values))
+            self._sorted = True
+
+        position = (len(self.values) - 1) * percentile / 100
+        lower = math.floor(position)
+        upper = math.ceil(position)
+
+        return (self.values[lower]
+                + (self.values[upper] - self.values[lower]) * (position - lower))
+
+    def result(self, aggregate):
+        if aggregate.operation == 'count':
+            return self.count
+        elif aggregate.operation == 'sum':
+            return self.total
+        elif aggregate.operation == 'min':
+            return self.minimum
+        elif aggregate.operation == 'max':
+            return self.maximum
+        elif aggregate.operation == 'mean':
+            if self.number_count == 0:
+                return None
+
+            return self.total / self.number_count
+        else:
+            return self.percentile(aggregate.percentile)
+
+
+class Aggregator:
+
+    def __init__(self, aggregates, group_by):
+        self.aggregates = aggregates
+
+        if group_by is None:
+            self.group_by = None
+        else:
+            self.group_by = group_by.split('.')
+
+        self.fields = {}
+
+        for aggregate in aggregates:
+            keep_values = self.fields.get(aggregate.field, False)
+            self.fields[aggregate.field] = (keep_values
+                                            or aggregate.percentile is not None)
+
+        self.groups = {}
+
+    def add(self, value):
+        if self.group_by is None:
+            group = None
+        else:
+            group = get_field(value, self.group_by)
+
+            if isinstance(group, (dict, list)):
+                group = str(group)
+
+        for field, field_statistics in self.get_group(group).items():
+            field_statistics.add(get_field(value, field))
+
+    def get_group(self, group):
+        statistics = self.groups.get(group)
+
+        if statistics is None:
+            statistics = {
+                field: FieldStatistics(keep_values)
+                for field, keep_values in self.fields.items()
+            }
+            self.groups[group] = statistics
+
+        return statistics
+
+    def rows(self):
+        rows = []
+
+        if self.group_by is None:
+            self.get_group(None)
+
+        for group, statistics in self.groups.items():
+            row = []
+
+            if self.group_by is not None:
+                row.append(group)
+
+            for aggregate in self.aggregates:
+                row.append(statistics[aggregate.field].result(aggregate))
+
+            rows.append(row)
+
+        return rows
+
+    def headers(self):
+        headers = [aggregate.name() for aggregate in self.aggregates]
+
+        if self.group_by is not None:
+            headers.insert(0, '.'.join(self.group_by))
+
+        return headers
+
+    def format(self):
+        return tabulate(self.rows(), self.headers())
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures import wait
+
+from .codec import loads
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._timestamp) * self.rate)
+            self._timestamp = now
+            # Tokens may be borrowed from the future, in which case the
+            # caller waits until they are available.
+            self._tokens -= 1
+            delay = -self._tokens / self.rate
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+def read_variables(fin):
+    for line_number, line in enumerate(fin, 1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        try:
+            variables = loads(line)
+        except Exception:
+            raise Exception(f'Invalid JSON on line {line_number}.')
+
+        if not isinstance(variables, dict):
+            raise Exception(f'Line {line_number} is not a JSON object.')
+
+        yield line_number, variables
+
+
+def run_batch(execute, rows, workers, rate, ordered, emit):
+    # rows are (index, variables) pairs. Calls emit(index, result) in
+    # input order, or in completion order if not ordered.
+    if rate is None:
+        limiter = None
+    else:
+        limiter = TokenBucket(rate)
+
+    def execute_limited(variables):
+        if limiter is not None:
+            limiter.acquire()
+
+        return execute(variables)
+
+    # Bounds the number of variables read but not yet emitted.
+    maximum_pending = 2 * workers
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        def emit_pending():
+            if ordered:
+                index, future = pending.popleft()
+                emit(index, future.result())
+            else:
+                done, _ = wait([future for _, future in pending],
+                               return_when=FIRST_COMPLETED)
+
+                for index, future in list(pending):
+                    if future in done:
+                        pending.remove((index, future))
+                        emit(index, future.result())
+
+        for index, variables in rows:
+            pending.append((index, executor.submit(execute_limited, variables)))
+
+            while len(pending) >= maximum_pending:
+                emit_pending()
+
+        while pending:
+            emit_pending()
+
+
+def run_named(execute, names, workers, fail_fast):
+    # Returns the responses of execute(name) keyed by name. Raises on
+    # the first response with errors if fail_fast is true.
+    responses = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        futures = {executor.submit(execute, name): name for name in names}
+
+        for future in as_completed(futures):
+            name = futures[future]
+            responses[name] = future.result()
+
+            if fail_fast and 'errors' in responses[name]:
+                message = responses[name]['errors'][0].get('message')
+
+                raise Exception(f"Query '{name}' failed: {message}")
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    else:
+        executor.shutdown()
+
+    return {name: responses[name] for name in names}
@@ -0,0 +1,147 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tabulate import tabulate
+
+from .aggregate import FieldStatistics
+
+PERCENTILES = [50, 90, 99]
+
+
+class Bench:
+
+    def __init__(self):
+        self.latencies = FieldStatistics(True)
+        self.sizes = FieldStatistics(False)
+        self.graphql_errors = 0
+        self.request_errors = {}
+        self.duration = 0
+        self._lock = threading.Lock()
+
+    def add(self, latency, size, has_errors):
+        with self._lock:
+            self.latencies.add(latency)
+            self.sizes.add(size)
+
+            if has_errors:
+                self.graphql_errors += 1
+
+    def add_error(self, error):
+        with self._lock:
+            self.request_errors[error] = self.request_errors.get(error, 0) + 1
+
+    def number_of_requests(self):
+        return self.latencies.count + sum(self.request_errors.values())
+
+    def report(self):
+        if self.duration > 0:
+            throughput = self.number_of_requests() / self.duration
+        else:
+            throughput = None
+
+        latencies = {
+            f'p{percentile}': milliseconds(self.latencies.percentile(percentile))
+            for percentile in PERCENTILES
+        }
+        latencies['max'] = milliseconds(self.latencies.maximum)
+
+        if self.sizes.count > 0:
+            mean_size = self.sizes.total / self.sizes.count
+        else:
+            mean_size = None
+
+        return {
+            'requests': self.number_of_requests(),
+            'duration': self.duration,
+            'throughput': throughput,
+            'latency_ms': latencies,
+            'graphql_errors': self.graphql_errors,
+            'request_errors': self.request_errors,
+            'response_bytes': {
+                'total': self.sizes.total,
+                'mean': mean_size
+            }
+        }
+
+
+def milliseconds(seconds):
+    if seconds is None:
+        return None
+
+    return 1000 * seconds
+
+
+def format_report(report):
+    rows = [
+        ['Requests', report['requests']],
+        ['Duration', f"{report['duration']:.2f} s"],
+        ['Throughput', format_number(report['throughput'], 'requests/s')]
+    ]
+
+    for name, latency in report['latency_ms'].items():
+        rows.append([f'Latency {name}', format_number(latency, 'ms')])
+
+    mean_size = report['response_bytes']['mean']
+    rows += [
+        ['GraphQL errors', report['graphql_errors']],
+        ['Request errors', sum(report['request_errors'].values())],
+        ['Response size', format_number(mean_size, 'bytes', 0)]
+    ]
+    text = tabulate(rows, tablefmt='plain')
+
+    if report['request_errors']:
+        text += '\n\n' + tabulate(report['request_errors'].items(),
+                                  ['Error', 'Count'])
+
+    return text
+
+
+def format_number(value, unit, decimals=2):
+    if value is None:
+        return '-'
+
+    return f'{value:.{decimals}f} {unit}'
+
+
+def run_bench(execute, iterations, duration, workers):
+    # execute() returns the response size and if the response has
+    # errors. Runs for given duration in seconds if not None, otherwise
+    # given number of iterations.
+    bench = Bench()
+    lock = threading.Lock()
+    remaining = [iterations]
+    start_time = time.monotonic()
+
+    def next_iteration():
+        if duration is not None:
+            return time.monotonic() - start_time < duration
+
+        with lock:
+            if remaining[0] == 0:
+                return False
+
+            remaining[0] -= 1
+
+            return True
+
+    def worker():
+        while next_iteration():
+            request_start_time = time.monotonic()
+
+            try:
+                size, has_errors = execute()
+            except Exception as error:
+                bench.add_error(str(error))
+            else:
+                bench.add(time.monotonic() - request_start_time, size, has_errors)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
+
+        for future in futures:
+            future.result()
+
+    bench.duration = time.monotonic() - start_time
+
+    return bench
@@ -0,0 +1,288 @@
+import csv
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from graphql.language import ListTypeNode
+from graphql.language import NonNullTypeNode
+from graphql.language import parse
+
+from .codec import dumps
+from .codec import loads
+from .document import get_operation
+
+CHECKPOINT_INTERVAL = 1
+BOOLEANS = {
+    'true': True,
+    '1': True,
+    'false': False,
+    '0': False
+}
+
+
+class OverloadedError(Exception):
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def get_variable_types(query):
+    _, operation = get_operation(parse(query))
+    variable_types = {}
+
+    for variable_definition in operation.variable_definitions or ():
+        variable_type = variable_definition.type
+
+        if isinstance(variable_type, NonNullTypeNode):
+            variable_type = variable_type.type
+
+        if isinstance(variable_type, ListTypeNode):
+            type_name = None
+        else:
+            type_name = variable_type.name.value
+
+        variable_types[variable_definition.variable.name.value] = type_name
+
+    return variable_types
+
+
+def convert_value(value, type_name):
+    if type_name in ['String', 'ID']:
+        return value
+    elif value == '':
+        return None
+    elif type_name == 'Int':
+        return int(value)
+    elif type_name == 'Float':
+        return float(value)
+    elif type_name == 'Boolean':
+        return BOOLEANS[value.lower()]
+    elif value[:1] in '[{"':
+        # Lists and input objects are given as JSON.
+        return loads(value)
+    else:
+        return value
+
+
+def read_rows(fin, variable_types):
+    reader = csv.DictReader(fin)
+
+    if reader.fieldnames is None:
+        return
+
+    for column in reader.fieldnames:
+        if column not in variable_types:
+            raise Exception(
+                f"CSV column '{column}' is not a variable in the query. "
+                f"Variables are: {', '.join(variable_types)}.")
+
+    for row_number, row in enumerate(reader, 1):
+        variables = {}
+
+        for column, value in row.items():
+            try:
+                variables[column] = convert_value(value, variable_types[column])
+            except Exception:
+                raise Exception(
+                    f"Invalid value '{value}' in column '{column}' on row "
+                    f"{row_number}.")
+
+        yield row_number, variables
+
+
+class Checkpoint:
+    # The file starts with a JSON snapshot of the progress, followed by
+    # the numbers of rows completed since, one per line, so no completed
+    # row is lost if the process is killed. The rows are merged into a
+    # new snapshot at most once per CHECKPOINT_INTERVAL seconds.
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = 0
+        self.done = set()
+        self._lock = threading.Lock()
+        # The first row saves a snapshot, as the file may end with a
+        # line cut short.
+        self._saved_at = None
+
+        if os.path.exists(path):
+            with open(path, 'rb') as fin:
+                lines = fin.read().split(b'\n')
+
+            checkpoint = loads(lines[0])
+            self.completed = checkpoint['completed']
+            self.done = set(checkpoint['done'])
+
+            # The last line is empty, or cut short by a kill.
+            for line in lines[1:-1]:
+                self._add(int(line))
+
+    def is_done(self, row_number):
+        return row_number <= self.completed or row_number in self.done
+
+    def _add(self, row_number):
+        self.done.add(row_number)
+
+        # Only rows completed out of order are stored individually.
+        while self.completed + 1 in self.done:
+            self.completed += 1
+            self.done.remove(self.completed)
+
+    def mark_done(self, row_number):
+        with self._lock:
+            self._add(row_number)
+
+            if (self._saved_at is None
+                    or time.monotonic() - self._saved_at >= CHECKPOINT_INTERVAL):
+                self._save()
+            else:
+                with open(self.path, 'ab') as fout:
+                    fout.write(f'{row_number}\n'.encode('utf-8'))
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        temporary_path = self.path + '.tmp'
+
+        with open(temporary_path, 'wb') as fout:
+            fout.write(dumps({
+                'completed': self.completed,
+                'done': sorted(self.done)
+            }).encode('utf-8') + b'\n')
+
+        os.replace(temporary_path, self.path)
+        self._saved_at = time.monotonic()
+
+
+class AdaptiveConcurrency:
+
+    def __init__(self, maximum, minimum=1, latency_factor=2):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.latency_factor = latency_factor
+        self.limit = minimum
+        self.in_flight = 0
+        self.baseline_latency = None
+        self.smoothed_latency = None
+        self._decreased_at = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+
+            self.in_flight += 1
+
+            return time.monotonic()
+
+    def release(self, start_time, overloaded):
+        now = time.monotonic()
+        latency = now - start_time
+
+        with self._condition:
+            self.in_flight -= 1
+
+            # A slowly moving baseline follows the normal latency of the
+            # server, which the recent latency is compared to.
+            if self.smoothed_latency is None:
+                self.baseline_latency = latency
+                self.smoothed_latency = latency
+            else:
+                self.baseline_latency = 0.98 * self.baseline_latency + 0.02 * latency
+                self.smoothed_latency = 0.8 * self.smoothed_latency + 0.2 * latency
+
+            overloaded = (overloaded
+                          or (self.smoothed_latency
+                              > self.latency_factor * self.baseline_latency))
+
+            if overloaded:
+                # Decrease at most once per round trip, as requests
+                # started before the previous decrease carry no news.
+                if start_time >= self._decreased_at:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._decreased_at = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+
+def execute_row(execute, concurrency, variables, policy, retryable):
+    # Overloaded requests are retried as the retry policy allows, if
+    # the query is retryable.
+    attempt = 0
+
+    while True:
+        start_time = concurrency.acquire()
+
+        try:
+            result = execute(variables)
+        except OverloadedError as error:
+            concurrency.release(start_time, True)
+
+            if not retryable or attempt >= policy.retries:
+                raise
+
+            delay = policy.delay(attempt, error.retry_after)
+
+            if delay is None:
+                raise
+
+            time.sleep(delay)
+            attempt += 1
+        except BaseException:
+            concurrency.release(start_time, False)
+            raise
+        else:
+            concurrency.release(start_time, False)
+
+            return result
+
+
+def run_bulk(execute, rows, workers, checkpoint, emit, policy, retryable):
+    # Calls emit(row_number, result, error) as rows complete. Rows that
+    # fail are not checkpointed and are thus retried by the next run.
+    concurrency = AdaptiveConcurrency(workers)
+    pending = threading.BoundedSemaphore(2 * workers)
+    lock = threading.Lock()
+
+    def run(row_number, variables):
+        try:
+            result = execute_row(execute,
+                                 concurrency,
+                                 variables,
+                                 policy,
+                                 retryable)
+        except Exception as error:
+            with lock:
+                emit(row_number, None, error)
+        else:
+            checkpoint.mark_done(row_number)
+
+            with lock:
+                emit(row_number, result, None)
+        finally:
+            pending.release()
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        for row_number, variables in rows:
+            if checkpoint.is_done(row_number):
+                continue
+
+            pending.acquire()
+            executor.submit(run, row_number, variables)
+    except BaseException:
+        # Rows not yet started are dropped if interrupted.
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    else:
+        executor.shutdown(wait=True)
+    finally:
+        checkpoint.save()
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import re
+import time
+
+from graphql.language import parse
+from graphql.language import print_ast
+from xdg import XDG_CACHE_HOME
+
+from .codec import dumps
+from .codec import loads
+
+CACHE_PATH = XDG_CACHE_HOME / 'gqt' / 'responses'
+MAX_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_TTL = 60
+MAX_AGE_RE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+
+
+def create_key(endpoint, query, variables, headers):
+    # Formatting differences in the query text do not matter.
+    key = dumps([
+        endpoint,
+        print_ast(parse(query)),
+        sorted((variables or {}).items()),
+        sorted((headers or {}).items())
+    ])
+
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def parse_cache_control(value):
+    # Returns if the response may be stored and its maximum age, if
+    # given.
+    if value is None:
+        return True, None
+
+    directives = [directive.strip().lower() for directive in value.split(',')]
+
+    if 'no-store' in directives:
+        return False, None
+
+    if 'no-cache' in directives:
+        return True, 0
+
+    match = MAX_AGE_RE.search(value)
+
+    if match is None:
+        return True, None
+
+    return True, int(match.group(1))
+
+
+class ResponseCache:
+
+    def __init__(self, path=CACHE_PATH, max_size=MAX_CACHE_SIZE):
+        self.path = path
+        self.max_size = max_size
+
+    def entry_path(self, key):
+        return self.path / f'{key}.json'
+
+    def get(self, key):
+        path = self.entry_path(key)
+
+        try:
+            entry = loads(path.read_bytes())
+        except Exception:
+            return None
+
+        # The modification time orders entries for eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return entry
+
+    def put(self, key, response, etag, expires):
+        self.path.mkdir(exist_ok=True, parents=True)
+        path = self.entry_path(key)
+        temporary_path = path.with_suffix('.tmp')
+        temporary_path.write_bytes(dumps({
+            'response': response,
+            'etag': etag,
+            'expires': expires
+        }).encode('utf-8'))
+        os.replace(temporary_path, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        size = 0
+
+        for path in self.path.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+            size += stat.st_size
+
+        entries.sort()
+
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+            size -= entry_size
+
+
+def execute_cached(fetch, cache, key, ttl, read):
+    # fetch(headers) returns a HTTP response. A fresh cached response is
+    # returned without fetching unless read is false. Stale responses
+    # with an ETag are revalidated.
+    entry = None
+    headers = {}
+
+    if read:
+        entry = cache.get(key)
+
+        if entry is not None:
+            if entry['expires'] > time.time():
+                return entry['response']
+
+            if entry['etag'] is not None:
+                headers['If-None-Match'] = entry['etag']
+
+    http_response = fetch(headers)
+    store, max_age = parse_cache_control(http_response.headers.get('Cache-Control'))
+
+    if max_age is None:
+        max_age = ttl
+
+    if http_response.status_code == 304 and entry is not None:
+        response = entry['response']
+        etag = entry['etag']
+    else:
+        response = loads(http_response.content)
+        etag = http_response.headers.get('ETag')
+
+    if store and 'errors' not in response:
+        cache.put(key, response, etag, time.time() + max_age)
+
+    return response
@@ -0,0 +1,48 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+INDENT_RE = re.compile(r'^(?:  )+', re.MULTILINE)
+
+
+def double_indent(match):
+    return match.group() * 2
+
+
+def loads(data):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # The standard library accepts more, for example NaN.
+            pass
+
+    return json.loads(data)
+
+
+def dumps(data):
+    if orjson is not None:
+        try:
+            return orjson.dumps(data).decode('utf-8')
+        except TypeError:
+            pass
+
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps_pretty(data):
+    if orjson is not None:
+        try:
+            data = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except TypeError:
+            pass
+        else:
+            # Strings never contain newlines, so each line starts with
+            # its indentation.
+            return INDENT_RE.sub(double_indent, data)
+
+    return json.dumps(data, ensure_ascii=False, indent=4)
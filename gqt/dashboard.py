@@ -0,0 +1,237 @@
+import curses
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .codec import dumps
+from .screen import addstr
+from .watch import format_path
+
+SPARKS = '▁▂▃▄▅▆▇█'
+HISTORY_LENGTH = 20
+HEADERS = ['NAME', 'VALUE', 'LATENCY', 'HISTORY', 'STATUS']
+STATUS_COLOR_PAIRS = {
+    'waiting': 0,
+    'ok': 1,
+    'error': 2
+}
+
+
+def sparkline(values):
+    if not values:
+        return ''
+
+    minimum = min(values)
+    maximum = max(values)
+
+    if maximum == minimum:
+        return SPARKS[0] * len(values)
+
+    return ''.join(
+        SPARKS[int((value - minimum) / (maximum - minimum) * (len(SPARKS) - 1))]
+        for value in values
+    )
+
+
+def iter_scalars(value, path=()):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from iter_scalars(item, path + (key,))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from iter_scalars(item, path + (index,))
+    else:
+        yield format_path(path), value
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class QueryState:
+
+    def __init__(self, name, fetch):
+        self.name = name
+        self.fetch = fetch
+        self.in_flight = False
+        self.latency = None
+        self.latencies = deque(maxlen=HISTORY_LENGTH)
+        self.error = None
+        self.values = {}
+        self.histories = {}
+
+    def update(self, latency, response, error):
+        self.latency = latency
+        self.latencies.append(latency)
+
+        if error is not None:
+            self.error = error
+
+            return
+
+        errors = response.get('errors')
+
+        if errors:
+            self.error = '; '.join(str(error.get('message')) for error in errors)
+        else:
+            self.error = None
+
+        if response.get('data') is None:
+            return
+
+        self.values = dict(iter_scalars(response['data']))
+
+        for path, value in self.values.items():
+            if is_number(value):
+                history = self.histories.get(path)
+
+                if history is None:
+                    history = deque(maxlen=HISTORY_LENGTH)
+                    self.histories[path] = history
+
+                history.append(value)
+
+    def status(self):
+        if self.latency is None:
+            return 'waiting'
+        elif self.error is None:
+            return 'ok'
+        else:
+            return 'error'
+
+    def rows(self):
+        if self.latency is None:
+            latency = ''
+        else:
+            latency = f'{1000 * self.latency:.0f} ms'
+
+        if self.error is None:
+            status = self.status()
+        else:
+            status = f'error: {self.error}'
+
+        rows = [[self.name, '', latency, sparkline(self.latencies), status]]
+
+        for path, value in self.values.items():
+            rows.append([
+                '  ' + path,
+                dumps(value),
+                '',
+                sparkline(self.histories.get(path, ())),
+                ''
+            ])
+
+        return rows
+
+
+def run_fetch(state, lock):
+    start_time = time.monotonic()
+    response = None
+    error = None
+
+    try:
+        response = state.fetch()
+    except Exception as fetch_error:
+        error = str(fetch_error)
+
+    latency = time.monotonic() - start_time
+
+    with lock:
+        state.update(latency, response, error)
+        state.in_flight = False
+
+
+class Dashboard:
+
+    def __init__(self, stdscr, title, states, interval, workers):
+        self.stdscr = stdscr
+        self.title = title
+        self.states = states
+        self.interval = interval
+        self.workers = workers
+        self.lock = threading.Lock()
+
+    def run(self):
+        self.stdscr.keypad(True)
+        self.stdscr.timeout(100)
+        curses.curs_set(0)
+        curses.use_default_colors()
+        curses.init_pair(1, curses.COLOR_GREEN, -1)
+        curses.init_pair(2, curses.COLOR_RED, -1)
+        curses.init_pair(3, curses.COLOR_CYAN, -1)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        next_refresh_time = 0
+
+        try:
+            while True:
+                if time.monotonic() >= next_refresh_time:
+                    self.refresh(executor)
+                    next_refresh_time = time.monotonic() + self.interval
+
+                self.draw()
+
+                if self.stdscr.getch() in [ord('q'), 27]:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def refresh(self, executor):
+        # Queries still in flight are skipped, so that slow ones do not
+        # delay the others.
+        with self.lock:
+            for state in self.states:
+                if not state.in_flight:
+                    state.in_flight = True
+                    executor.submit(run_fetch, state, self.lock)
+
+    def draw(self):
+        with self.lock:
+            rows = [HEADERS]
+            statuses = [None]
+
+            for state in self.states:
+                state_rows = state.rows()
+                rows += state_rows
+                statuses += [state.status()] + [None] * (len(state_rows) - 1)
+
+        _, x_max = self.stdscr.getmaxyx()
+        widths = [
+            max(len(row[column]) for row in rows)
+            for column in range(len(HEADERS) - 1)
+        ]
+        self.stdscr.erase()
+        addstr(self.stdscr,
+               0,
+               0,
+               f'{self.title} - every {self.interval:g} s - q to quit'[:x_max - 1],
+               curses.A_BOLD)
+
+        for y, (row, status) in enumerate(zip(rows, statuses), 2):
+            x = 0
+
+            for column, text in enumerate(row):
+                if y == 2:
+                    attrs = curses.color_pair(3)
+                elif column == len(HEADERS) - 1 and status is not None:
+                    attrs = curses.color_pair(STATUS_COLOR_PAIRS[status])
+                elif column == 0 and status is not None:
+                    attrs = curses.A_BOLD
+                else:
+                    attrs = 0
+
+                if x < x_max - 1:
+                    addstr(self.stdscr, y, x, text[:x_max - 1 - x], attrs)
+
+                if column < len(widths):
+                    x += widths[column] + 2
+
+        self.stdscr.refresh()
+
+
+def dashboard(stdscr, title, states, interval, workers):
+    Dashboard(stdscr, title, states, interval, workers).run()
+
+
+def run_dashboard(title, states, interval, workers):
+    curses.wrapper(dashboard, title, states, interval, workers)
@@ -1,10 +1,11 @@
-import json
 import shutil
 from urllib.parse import quote_plus
 from urllib.parse import unquote_plus
 
 from xdg import XDG_DATA_HOME
 
+from .codec import dumps
+from .codec import loads
 from .tree import load_tree_from_json
 
 DATABASE_PATH = XDG_DATA_HOME / 'gqt' / 'database'
@@ -27,6 +28,14 @@ def make_most_recent_query_name_path(endpoint):
     return make_endpoint_path(endpoint) / 'most_recent_query_name.txt'
 
 
+def make_persisted_queries_path(endpoint):
+    return make_endpoint_path(endpoint) / 'persisted_queries.json'
+
+
+def make_cache_ttl_path(endpoint, query_name):
+    return make_query_json_path(endpoint, query_name).parent / 'cache_ttl.txt'
+
+
 def read_tree_from_database(endpoint, query_name):
     path = make_query_json_path(endpoint, query_name)
 
@@ -34,19 +43,19 @@ def read_tree_from_database(endpoint, query_name):
         most_recent_path = make_most_recent_query_name_path(endpoint)
 
         if most_recent_path.exists():
-            query_name = most_recent_path.read_text()
+            query_name = most_recent_path.read_text(encoding='utf-8')
         else:
             query_name = None
 
         path = make_query_json_path(endpoint, query_name)
 
-    return load_tree_from_json(json.loads(path.read_text()))
+    return load_tree_from_json(loads(path.read_bytes()))
 
 
 def write_tree_to_database(tree, endpoint, query_name):
     path = make_query_json_path(endpoint, query_name)
     path.parent.mkdir(exist_ok=True, parents=True)
-    path.write_text(json.dumps(tree.to_json()))
+    path.write_bytes(dumps(tree.to_json()).encode('utf-8'))
     path = make_most_recent_query_name_path(endpoint)
 
     if query_name is None:
@@ -55,13 +64,59 @@ def write_tree_to_database(tree, endpoint, query_name):
         except FileNotFoundError:
             pass
     else:
-        path.write_text(query_name)
+        path.write_text(query_name, encoding='utf-8')
+
+
+def read_persisted_queries(endpoint):
+    path = make_persisted_queries_path(endpoint)
+
+    if not path.exists():
+        return {}
+
+    return loads(path.read_bytes())
+
+
+def write_persisted_queries(endpoint, persisted_queries):
+    path = make_persisted_queries_path(endpoint)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    path.write_bytes(dumps(persisted_queries).encode('utf-8'))
+
+
+def add_persisted_query(endpoint, query_hash, query):
+    persisted_queries = read_persisted_queries(endpoint)
+    persisted_queries[query_hash] = query
+    write_persisted_queries(endpoint, persisted_queries)
+
+
+def remove_persisted_query(endpoint, query_hash):
+    persisted_queries = read_persisted_queries(endpoint)
+
+    if persisted_queries.pop(query_hash, None) is not None:
+        write_persisted_queries(endpoint, persisted_queries)
+
+
+def read_cache_ttl(endpoint, query_name):
+    try:
+        return float(make_cache_ttl_path(endpoint, query_name).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_ttl(endpoint, query_name, ttl):
+    path = make_cache_ttl_path(endpoint, query_name)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    path.write_text(f'{ttl:g}')
 
 
 def clear_database():
     shutil.rmtree(DATABASE_PATH, ignore_errors=True)
 
 
+def get_query_names(endpoint):
+    return sorted(path.name
+                  for path in make_endpoint_path(endpoint).glob('query_names/*'))
+
+
 def get_queries():
     items = []
 
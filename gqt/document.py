@@ -0,0 +1,143 @@
+from graphql.language import ArgumentNode
+from graphql.language import FieldNode
+from graphql.language import NamedTypeNode
+from graphql.language import NameNode
+from graphql.language import OperationDefinitionNode
+from graphql.language import OperationType
+from graphql.language import SelectionSetNode
+from graphql.language import VariableDefinitionNode
+from graphql.language import VariableNode
+from graphql.language import parse
+
+
+def replace_node(node, **changes):
+    # AST nodes are immutable in newer versions of graphql-core.
+    kwargs = {key: getattr(node, key) for key in node.keys}
+    kwargs.update(changes)
+
+    return type(node)(**kwargs)
+
+
+def name_node(name):
+    return NameNode(value=name)
+
+
+def variable_node(name):
+    return VariableNode(name=name_node(name))
+
+
+def response_key(field):
+    if field.alias is not None:
+        return field.alias.value
+    else:
+        return field.name.value
+
+
+def get_operation(document):
+    for index, definition in enumerate(document.definitions):
+        if isinstance(definition, OperationDefinitionNode):
+            return index, definition
+
+    raise Exception('No operation found in the query.')
+
+
+def is_query_operation(query):
+    _, operation = get_operation(parse(query))
+
+    return operation.operation == OperationType.QUERY
+
+
+def replace_operation(document, index, operation):
+    definitions = list(document.definitions)
+    definitions[index] = operation
+
+    return replace_node(document, definitions=tuple(definitions))
+
+
+def find_field(selection_set, path):
+    if selection_set is None:
+        return None
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode) and response_key(selection) == path[0]:
+            if len(path) == 1:
+                return selection
+            else:
+                return find_field(selection.selection_set, path[1:])
+
+    return None
+
+
+def update_field(selection_set, path, update):
+    selections = list(selection_set.selections)
+
+    for index, selection in enumerate(selections):
+        if isinstance(selection, FieldNode) and response_key(selection) == path[0]:
+            if len(path) == 1:
+                selections[index] = update(selection)
+            else:
+                selections[index] = replace_node(
+                    selection,
+                    selection_set=update_field(selection.selection_set,
+                                               path[1:],
+                                               update))
+
+            return replace_node(selection_set, selections=tuple(selections))
+
+    raise Exception(f"Field '{path[0]}' not found in the query.")
+
+
+def add_field(selection_set, path):
+    if selection_set is None:
+        selection_set = SelectionSetNode(selections=())
+
+    field = find_field(selection_set, path[:1])
+
+    if field is None:
+        field = FieldNode(name=name_node(path[0]),
+                          arguments=(),
+                          directives=())
+        selection_set = replace_node(selection_set,
+                                     selections=(*selection_set.selections, field))
+
+    if len(path) == 1:
+        return selection_set
+
+    return update_field(
+        selection_set,
+        path[:1],
+        lambda field: replace_node(field,
+                                   selection_set=add_field(field.selection_set,
+                                                           path[1:])))
+
+
+def get_argument(field, name):
+    for argument in field.arguments or ():
+        if argument.name.value == name:
+            return argument
+
+    return None
+
+
+def set_argument(field, name, value):
+    arguments = list(field.arguments or ())
+
+    for index, argument in enumerate(arguments):
+        if argument.name.value == name:
+            arguments[index] = replace_node(argument, value=value)
+            break
+    else:
+        arguments.append(ArgumentNode(name=name_node(name), value=value))
+
+    return replace_node(field, arguments=tuple(arguments))
+
+
+def add_variable(operation, name, type_name):
+    variable_definition = VariableDefinitionNode(
+        variable=variable_node(name),
+        type=NamedTypeNode(name=name_node(type_name)),
+        directives=())
+
+    return replace_node(operation,
+                        variable_definitions=(*(operation.variable_definitions or ()),
+                                              variable_definition))
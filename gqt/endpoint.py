@@ -1,15 +1,38 @@
+import gzip
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 
 import requests
+import urllib3
 from graphql import get_introspection_query
 
+from .codec import dumps
+from .codec import loads
+from .retry import is_query_request
+from .retry import send_with_retries
+from .stream import CHUNK_SIZE
 
-def fetch_schema(endpoint, headers, verify):
+# Longer URLs are rejected by some servers, proxies and CDNs.
+MAX_URL_LENGTH = 2048
+CACHE_HEADERS = ['Age', 'X-Cache', 'CF-Cache-Status']
+# Smaller bodies are not worth compressing.
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+
+def fetch_schema(endpoint, headers, verify, compress=False, policy=None):
     response = post(endpoint,
                     {'query': get_introspection_query()},
                     headers,
-                    verify)
-    response = response.json()
+                    verify,
+                    compress=compress,
+                    policy=policy)
+    response = loads(response.content)
 
     if 'errors' in response:
         sys.exit(response['errors'])
@@ -17,11 +40,186 @@ def fetch_schema(endpoint, headers, verify):
     return response['data']
 
 
-def post(endpoint, query, headers, verify):
-    response = requests.post(endpoint,
-                             json=query,
-                             headers=headers,
-                             verify=verify)
+def make_session(pool_size=10):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                            pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def create_get_url(endpoint, query):
+    parameters = {}
+
+    for key, value in query.items():
+        if isinstance(value, str):
+            parameters[key] = value
+        else:
+            parameters[key] = dumps(value)
+
+    if '?' in endpoint:
+        separator = '&'
+    else:
+        separator = '?'
+
+    return endpoint + separator + urlencode(parameters)
+
+
+def create_body(query, headers, compress):
+    # Returns keyword arguments of the request. Large bodies are gzip
+    # compressed if compress is true.
+    if compress:
+        body = dumps(query).encode('utf-8')
+
+        if len(body) >= COMPRESS_MIN_SIZE:
+            return {
+                'data': gzip.compress(body, compresslevel=COMPRESS_LEVEL),
+                'headers': {
+                    'Content-Type': 'application/json',
+                    **(headers or {}),
+                    'Content-Encoding': 'gzip'
+                }
+            }
+
+    return {'json': query, 'headers': headers}
+
+
+def format_size(size, encoding, decoded_size):
+    if encoding in [None, 'identity']:
+        return f'{decoded_size} B'
+
+    return f'{size} B {encoding} ({decoded_size} B decoded)'
+
+
+def format_sizes(response, received=True):
+    # The received size is left out of streamed responses, as their
+    # body is yet to be read.
+    body = response.request.body or b''
+    encoding = response.request.headers.get('Content-Encoding')
+
+    if encoding == 'gzip':
+        # The gzip trailer ends with the uncompressed size.
+        decoded_size = int.from_bytes(body[-4:], 'little')
+    else:
+        decoded_size = len(body)
+
+    text = f'sent {format_size(len(body), encoding, decoded_size)}'
+
+    if not received:
+        return text
+
+    # Reading the content makes the raw response report the number of
+    # bytes received.
+    decoded_size = len(response.content)
+    size = response.raw.tell()
+    encoding = response.headers.get('Content-Encoding')
+
+    return text + f', received {format_size(size, encoding, decoded_size)}'
+
+
+def format_timing(response, received=True):
+    text = (f'{response.request.method} {response.status_code} '
+            f'{1000 * response.elapsed.total_seconds():.1f} ms, '
+            f'{format_sizes(response, received)}')
+
+    for name in CACHE_HEADERS:
+        value = response.headers.get(name)
+
+        if value is not None:
+            text += f', {name}: {value}'
+
+    return text
+
+
+def iter_body(response, policy, chunk_size=CHUNK_SIZE):
+    # Yields the body as it arrives. Unlike iter_content, fails once
+    # the deadline of policy has passed, even if the server keeps
+    # sending slowly.
+    if policy is None or policy.end_time is None:
+        yield from response.iter_content(chunk_size)
+
+        return
+
+    while True:
+        policy.remaining()
+
+        try:
+            chunk = response.raw.read1(chunk_size, decode_content=True)
+        except urllib3.exceptions.ReadTimeoutError as error:
+            policy.remaining()
+
+            raise requests.exceptions.ConnectionError(error)
+        except urllib3.exceptions.ProtocolError as error:
+            raise requests.exceptions.ChunkedEncodingError(error)
+
+        if not chunk:
+            break
+
+        yield chunk
+
+
+def post(endpoint,
+         query,
+         headers,
+         verify,
+         stream=False,
+         session=None,
+         get=False,
+         verbose=False,
+         compress=False,
+         policy=None):
+    # Queries are sent as GET if get is true and the URL is not too
+    # long. Mutations must never be. Timeouts and retries are given by
+    # policy, if any.
+    if session is None:
+        session = requests
+
+    if get:
+        url = create_get_url(endpoint, query)
+
+        if len(url) > MAX_URL_LENGTH:
+            get = False
+
+    if get:
+        kwargs = {'headers': headers}
+    else:
+        kwargs = create_body(query, headers, compress)
+
+    # With a deadline the body is read here instead of by requests, so
+    # that a slowly sent body cannot pass it.
+    read_body = not stream and policy is not None and policy.end_time is not None
+
+    def send(timeout=None):
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+
+        if get:
+            response = session.get(url,
+                                   verify=verify,
+                                   stream=stream or read_body,
+                                   **kwargs)
+        else:
+            response = session.post(endpoint,
+                                    verify=verify,
+                                    stream=stream or read_body,
+                                    **kwargs)
+
+        if read_body:
+            response._content = b''.join(iter_body(response, policy))
+            response._content_consumed = True
+
+        if verbose:
+            print(format_timing(response, not stream), file=sys.stderr)
+
+        return response
+
+    if policy is None:
+        response = send()
+    else:
+        response = send_with_retries(send, policy, query)
+
     response.raise_for_status()
 
     return response
@@ -34,3 +232,212 @@ def create_query(query, variables):
         query['variables'] = variables
 
     return query
+
+
+class Transport:
+
+    def __init__(self,
+                 endpoint,
+                 headers,
+                 verify,
+                 session,
+                 compress=False,
+                 policy=None,
+                 get=False,
+                 verbose=False):
+        self.endpoint = endpoint
+        self.headers = headers
+        self.verify = verify
+        self.session = session
+        self.compress = compress
+        self.policy = policy
+        self.get = get
+        self.verbose = verbose
+
+    def post(self, query, stream=False, headers=None, get=None):
+        # Returns the HTTP response. Extra headers are added to those of
+        # the transport. Only queries are sent as GET, unless get says
+        # otherwise.
+        if get is None:
+            get = is_query_request(query)
+
+        if headers:
+            headers = {**(self.headers or {}), **headers}
+        else:
+            headers = self.headers
+
+        return post(self.endpoint,
+                    query,
+                    headers,
+                    self.verify,
+                    stream=stream,
+                    session=self.session,
+                    get=self.get and get,
+                    verbose=self.verbose,
+                    compress=self.compress,
+                    policy=self.policy)
+
+    def execute(self, query):
+        return loads(self.post(query).content)
+
+    def close(self):
+        pass
+
+
+class BatchingTransport(Transport):
+    # Sends queries executed concurrently by several threads as JSON
+    # arrays of up to max_batch_size queries, waiting at most linger
+    # seconds for more queries to arrive. Falls back to one query per
+    # request if the server does not accept arrays.
+
+    def __init__(self,
+                 endpoint,
+                 headers,
+                 verify,
+                 session,
+                 max_batch_size,
+                 linger,
+                 workers=4,
+                 compress=False,
+                 policy=None,
+                 get=False,
+                 verbose=False):
+        super().__init__(endpoint,
+                         headers,
+                         verify,
+                         session,
+                         compress,
+                         policy,
+                         get,
+                         verbose)
+        self.max_batch_size = max_batch_size
+        self.linger = linger
+        self.batching = True
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def execute(self, query):
+        if not self.batching:
+            return super().execute(query)
+
+        future = Future()
+        self._queue.put((query, future))
+
+        return future.result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._executor.shutdown()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.linger
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+                if item is None:
+                    self._queue.put(None)
+                    break
+
+                batch.append(item)
+
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch):
+        if self.batching and len(batch) > 1:
+            try:
+                responses = self._post_batch([query for query, _ in batch])
+            except BaseException as error:
+                for _, future in batch:
+                    future.set_exception(error)
+
+                return
+
+            if responses is not None:
+                for (_, future), response in zip(batch, responses):
+                    future.set_result(response)
+
+                return
+
+        for query, future in batch:
+            try:
+                future.set_result(Transport.execute(self, query))
+            except BaseException as error:
+                future.set_exception(error)
+
+    def _post_batch(self, queries):
+        try:
+            response = self.post(queries, get=False)
+        except requests.exceptions.HTTPError as error:
+            # Servers not accepting arrays may respond with a client
+            # error.
+            if error.response.status_code >= 500:
+                raise
+
+            response = error.response
+
+        if response.status_code == 200:
+            try:
+                responses = loads(response.content)
+            except Exception:
+                responses = None
+
+            if isinstance(responses, list) and len(responses) == len(queries):
+                return responses
+
+        self.batching = False
+
+        return None
+
+
+def make_transport(endpoint,
+                   headers,
+                   verify,
+                   workers,
+                   max_batch_size,
+                   linger,
+                   compress=False,
+                   policy=None,
+                   get=False,
+                   verbose=False):
+    session = make_session(workers)
+
+    if max_batch_size is None or max_batch_size < 2:
+        return Transport(endpoint,
+                         headers,
+                         verify,
+                         session,
+                         compress,
+                         policy,
+                         get,
+                         verbose)
+    else:
+        return BatchingTransport(endpoint,
+                                 headers,
+                                 verify,
+                                 session,
+                                 max_batch_size,
+                                 linger,
+                                 workers,
+                                 compress,
+                                 policy,
+                                 get,
+                                 verbose)
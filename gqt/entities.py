@@ -0,0 +1,572 @@
+import hashlib
+import os
+import time
+
+from graphql import Undefined
+from graphql import get_named_type
+from graphql import is_abstract_type
+from graphql import is_interface_type
+from graphql import is_object_type
+from graphql.language import FieldNode
+from graphql.language import FragmentSpreadNode
+from graphql.language import InlineFragmentNode
+from graphql.language import OperationDefinitionNode
+from graphql.language import OperationType
+from graphql.language import Visitor
+from graphql.language import parse
+from graphql.language import print_ast
+from graphql.language import visit
+from graphql.utilities import value_from_ast_untyped
+from xdg import XDG_CACHE_HOME
+
+from .cache import parse_cache_control
+from .codec import dumps
+from .codec import loads
+from .document import get_operation
+from .document import name_node
+from .document import replace_node
+from .document import replace_operation
+from .document import response_key
+
+ENTITIES_PATH = XDG_CACHE_HOME / 'gqt' / 'entities'
+ROOT_KEY = 'ROOT_QUERY'
+KEY_FIELDS = ['__typename', 'id']
+
+
+class CacheMiss(Exception):
+    pass
+
+
+class CollectVariables(Visitor):
+
+    def __init__(self):
+        super().__init__()
+        self.names = set()
+
+    def enter_variable(self, node, *args):
+        self.names.add(node.name.value)
+
+
+class HasDirectives(Visitor):
+
+    def __init__(self):
+        super().__init__()
+        self.found = False
+
+    def enter_directive(self, node, *args):
+        self.found = True
+
+
+def make_store_path(endpoint, headers):
+    key = dumps([endpoint, sorted((headers or {}).items())])
+
+    return ENTITIES_PATH / f'{hashlib.sha256(key.encode("utf-8")).hexdigest()}.json'
+
+
+def field_key(field, variables):
+    # Fields are stored by name and arguments, as aliases are chosen by
+    # the query. Arguments given variables that are not set are left
+    # out, like the server does.
+    arguments = {}
+
+    for argument in field.arguments or []:
+        value = value_from_ast_untyped(argument.value, variables)
+
+        if value is not Undefined:
+            arguments[argument.name.value] = value
+
+    if not arguments:
+        return field.name.value
+
+    return f'{field.name.value}({dumps(dict(sorted(arguments.items())))})'
+
+
+def entity_key(data):
+    if not isinstance(data, dict):
+        return None
+
+    typename = data.get('__typename')
+    entity_id = data.get('id')
+
+    if typename is None or entity_id is None:
+        return None
+
+    return f'{typename}:{entity_id}'
+
+
+def is_key_field(selection):
+    return (isinstance(selection, FieldNode)
+            and selection.alias is None
+            and selection.name.value in KEY_FIELDS)
+
+
+def is_inline_object(value):
+    return isinstance(value, dict) and '__ref' not in value
+
+
+def is_cacheable(document):
+    # Only single queries without fragment spreads and directives are
+    # normalized, which covers all queries built by gqt.
+    if len(document.definitions) != 1:
+        return False
+
+    operation = document.definitions[0]
+
+    if not isinstance(operation, OperationDefinitionNode):
+        return False
+
+    if operation.operation != OperationType.QUERY:
+        return False
+
+    visitor = HasDirectives()
+    visit(operation, visitor)
+
+    if visitor.found:
+        return False
+
+    return not any(isinstance(node, FragmentSpreadNode)
+                   for node in iter_selections(operation.selection_set))
+
+
+def iter_selections(selection_set):
+    if selection_set is None:
+        return
+
+    for selection in selection_set.selections:
+        yield selection
+
+        if not isinstance(selection, FragmentSpreadNode):
+            yield from iter_selections(selection.selection_set)
+
+
+def add_key_fields_to_selection_set(selection_set, parent_type, schema):
+    selections = []
+
+    for selection in selection_set.selections:
+        if selection.selection_set is not None:
+            if isinstance(selection, InlineFragmentNode):
+                if selection.type_condition is None:
+                    selection_type = parent_type
+                else:
+                    selection_type = schema.get_type(
+                        selection.type_condition.name.value)
+            else:
+                selection_type = get_named_type(
+                    parent_type.fields[selection.name.value].type)
+
+            selection = replace_node(
+                selection,
+                selection_set=add_key_fields_to_selection_set(
+                    selection.selection_set,
+                    selection_type,
+                    schema))
+
+        selections.append(selection)
+
+    keys = ['__typename']
+
+    if ((is_object_type(parent_type) or is_interface_type(parent_type))
+            and 'id' in parent_type.fields):
+        keys.append('id')
+
+    selected = [selection.name.value
+                for selection in selections
+                if is_key_field(selection)]
+    selections = [
+        FieldNode(name=name_node(key), arguments=(), directives=())
+        for key in keys
+        if key not in selected
+    ] + selections
+
+    return replace_node(selection_set, selections=tuple(selections))
+
+
+def add_key_fields(document, schema):
+    # Adds __typename to all selections and id to selections of types
+    # that have it, so that response objects can be normalized.
+    index, operation = get_operation(document)
+    selections = []
+
+    for selection in operation.selection_set.selections:
+        if selection.selection_set is not None:
+            field_type = get_named_type(
+                schema.query_type.fields[selection.name.value].type)
+            selection = replace_node(
+                selection,
+                selection_set=add_key_fields_to_selection_set(selection.selection_set,
+                                                              field_type,
+                                                              schema))
+
+        selections.append(selection)
+
+    operation = replace_node(
+        operation,
+        selection_set=replace_node(operation.selection_set,
+                                   selections=tuple(selections)))
+
+    return replace_operation(document, index, operation)
+
+
+def remove_unused_variables(document, variables):
+    index, operation = get_operation(document)
+    visitor = CollectVariables()
+    visit(operation.selection_set, visitor)
+    variable_definitions = tuple(
+        variable_definition
+        for variable_definition in operation.variable_definitions or ()
+        if variable_definition.variable.name.value in visitor.names
+    )
+    operation = replace_node(operation, variable_definitions=variable_definitions)
+    variables = {
+        name: value
+        for name, value in variables.items()
+        if name in visitor.names
+    }
+
+    return replace_operation(document, index, operation), variables
+
+
+def merge_data(old, new):
+    if isinstance(old, dict) and isinstance(new, dict):
+        merged = dict(old)
+
+        for key, value in new.items():
+            merged[key] = merge_data(merged.get(key), value)
+
+        return merged
+
+    return new
+
+
+class EntityStore:
+    # Entities are stored by __typename and id, and root query fields
+    # under ROOT_QUERY. Each stored field is a list of its value and
+    # expiry time. Other objects are stored inline, and objects with an
+    # id as references {'__ref': key}.
+
+    def __init__(self, schema, path):
+        self.schema = schema
+        self.path = path
+
+        try:
+            self.entities = loads(path.read_bytes())
+        except Exception:
+            self.entities = {}
+
+    def save(self):
+        # Expired fields and empty entities are dropped.
+        now = time.time()
+        entities = {}
+
+        for key, fields in self.entities.items():
+            fields = {
+                name: entry
+                for name, entry in fields.items()
+                if entry[1] > now
+            }
+
+            if fields:
+                entities[key] = fields
+
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        temporary_path = self.path.with_suffix('.tmp')
+        temporary_path.write_bytes(dumps(entities).encode('utf-8'))
+        os.replace(temporary_path, self.path)
+
+    def write(self, document, data, variables, expires):
+        _, operation = get_operation(document)
+        self.write_fields(operation.selection_set,
+                          data,
+                          variables,
+                          expires,
+                          self.entities.setdefault(ROOT_KEY, {}))
+
+    def write_fields(self, selection_set, data, variables, expires, fields):
+        for selection in selection_set.selections:
+            if isinstance(selection, InlineFragmentNode):
+                self.write_fields(selection.selection_set,
+                                  data,
+                                  variables,
+                                  expires,
+                                  fields)
+                continue
+
+            name = response_key(selection)
+
+            if name not in data:
+                continue
+
+            key = field_key(selection, variables)
+            previous = fields.get(key)
+
+            if previous is not None:
+                previous = previous[0]
+
+            fields[key] = [
+                self.write_value(selection.selection_set,
+                                 data[name],
+                                 variables,
+                                 expires,
+                                 previous),
+                expires
+            ]
+
+    def write_value(self, selection_set, value, variables, expires, previous):
+        if selection_set is None or value is None:
+            return value
+
+        if isinstance(value, list):
+            return [
+                self.write_value(selection_set, item, variables, expires, None)
+                for item in value
+            ]
+
+        key = entity_key(value)
+
+        if key is not None:
+            self.write_fields(selection_set,
+                              value,
+                              variables,
+                              expires,
+                              self.entities.setdefault(key, {}))
+
+            return {'__ref': key}
+
+        if is_inline_object(previous):
+            fields = previous
+        else:
+            fields = {}
+
+        self.write_fields(selection_set, value, variables, expires, fields)
+
+        return fields
+
+    def applies(self, fragment, fields):
+        if fragment.type_condition is None:
+            return True
+
+        entry = fields.get('__typename')
+
+        if entry is None:
+            raise CacheMiss()
+
+        condition = fragment.type_condition.name.value
+
+        if entry[0] == condition:
+            return True
+
+        condition_type = self.schema.get_type(condition)
+        object_type = self.schema.get_type(entry[0])
+
+        if object_type is None or not is_abstract_type(condition_type):
+            return False
+
+        return self.schema.is_sub_type(condition_type, object_type)
+
+    def resolve(self, value):
+        if '__ref' not in value:
+            return value
+
+        fields = self.entities.get(value['__ref'])
+
+        if fields is None:
+            raise CacheMiss()
+
+        return fields
+
+    def read(self, document, variables, now):
+        # Returns the data of given query from fresh cached fields, or
+        # raises CacheMiss.
+        _, operation = get_operation(document)
+        data = {}
+        self.read_fields(operation.selection_set,
+                         self.entities.get(ROOT_KEY, {}),
+                         variables,
+                         now,
+                         data)
+
+        return data
+
+    def read_fields(self, selection_set, fields, variables, now, data):
+        for selection in selection_set.selections:
+            if isinstance(selection, InlineFragmentNode):
+                if self.applies(selection, fields):
+                    self.read_fields(selection.selection_set,
+                                     fields,
+                                     variables,
+                                     now,
+                                     data)
+
+                continue
+
+            entry = fields.get(field_key(selection, variables))
+
+            if entry is None or entry[1] <= now:
+                raise CacheMiss()
+
+            name = response_key(selection)
+            data[name] = merge_data(data.get(name),
+                                    self.read_value(selection.selection_set,
+                                                    entry[0],
+                                                    variables,
+                                                    now))
+
+    def read_value(self, selection_set, value, variables, now):
+        if selection_set is None or value is None:
+            return value
+
+        if isinstance(value, list):
+            return [
+                self.read_value(selection_set, item, variables, now)
+                for item in value
+            ]
+
+        data = {}
+        self.read_fields(selection_set, self.resolve(value), variables, now, data)
+
+        return data
+
+    def prune(self, document, variables, now):
+        # Returns given query without the fields that are fresh in the
+        # cache, or None if all are.
+        index, operation = get_operation(document)
+        selection_set = self.prune_selection_set(operation.selection_set,
+                                                 [self.entities.get(ROOT_KEY, {})],
+                                                 variables,
+                                                 now)
+
+        if selection_set is None:
+            return None
+
+        operation = replace_node(operation, selection_set=selection_set)
+
+        return replace_operation(document, index, operation)
+
+    def prune_selection_set(self, selection_set, objects, variables, now):
+        selections = []
+        missing = False
+
+        for selection in selection_set.selections:
+            if is_key_field(selection):
+                selections.append(selection)
+                continue
+
+            try:
+                if isinstance(selection, InlineFragmentNode):
+                    pruned = self.prune_selection_set(
+                        selection.selection_set,
+                        [
+                            fields
+                            for fields in objects
+                            if self.applies(selection, fields)
+                        ],
+                        variables,
+                        now)
+
+                    if pruned is not None:
+                        pruned = replace_node(selection, selection_set=pruned)
+                else:
+                    pruned = self.prune_field(selection, objects, variables, now)
+            except CacheMiss:
+                pruned = selection
+
+            if pruned is not None:
+                selections.append(pruned)
+                missing = True
+
+        if not missing:
+            return None
+
+        return replace_node(selection_set, selections=tuple(selections))
+
+    def prune_field(self, field, objects, variables, now):
+        key = field_key(field, variables)
+        children = []
+
+        for fields in objects:
+            entry = fields.get(key)
+
+            if entry is None or entry[1] <= now:
+                raise CacheMiss()
+
+            children += self.iter_objects(entry[0])
+
+        if field.selection_set is None:
+            return None
+
+        selection_set = self.prune_selection_set(field.selection_set,
+                                                 children,
+                                                 variables,
+                                                 now)
+
+        if selection_set is None:
+            return None
+
+        return replace_node(field, selection_set=selection_set)
+
+    def iter_objects(self, value):
+        if isinstance(value, list):
+            for item in value:
+                yield from self.iter_objects(item)
+        elif isinstance(value, dict):
+            yield self.resolve(value)
+
+
+def execute_entity_cached(fetch, store, query, variables, ttl):
+    # fetch(query, variables) returns a HTTP response. Only fields not
+    # fresh in the store are fetched, and the response is built from
+    # the store.
+    document = parse(query)
+
+    if not is_cacheable(document):
+        return loads(fetch(query, variables).content)
+
+    now = time.time()
+    keyed_document = add_key_fields(document, store.schema)
+
+    def fetch_and_write(document):
+        document, document_variables = remove_unused_variables(document,
+                                                               variables)
+        http_response = fetch(print_ast(document), document_variables)
+        response = loads(http_response.content)
+
+        if 'errors' in response or response.get('data') is None:
+            return response
+
+        store_response, max_age = parse_cache_control(
+            http_response.headers.get('Cache-Control'))
+
+        if not store_response:
+            max_age = 0
+        elif max_age is None:
+            max_age = ttl
+
+        store.write(document,
+                    response['data'],
+                    document_variables,
+                    time.time() + max_age)
+
+        return None
+
+    pruned_document = store.prune(keyed_document, variables, now)
+
+    if pruned_document is not None:
+        response = fetch_and_write(pruned_document)
+
+        if response is not None:
+            return response
+
+    try:
+        data = store.read(document, variables, now)
+    except CacheMiss:
+        # New objects may lack fields that were pruned from the query.
+        response = fetch_and_write(keyed_document)
+
+        if response is not None:
+            return response
+
+        data = store.read(document, variables, now)
+
+    store.save()
+
+    return {'data': data}
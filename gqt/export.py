@@ -0,0 +1,123 @@
+import base64
+import json
+
+CURL_COMMAND = '''\
+curl -X POST \\
+     -H 'content-type: application/json' \\
+{headers}\
+     {endpoint} \\
+     -d {query}\
+'''
+
+K6_SCRIPT = '''\
+// k6 run script.js
+import http from 'k6/http';
+import {{ check }} from 'k6';
+
+const ENDPOINT = {endpoint};
+const BODY = JSON.stringify({query});
+const PARAMS = {{
+    headers: {headers}
+}};
+
+export default function () {{
+    const response = http.post(ENDPOINT, BODY, PARAMS);
+
+    check(response, {{
+        'status is 200': (r) => r.status === 200,
+        'no errors': (r) => r.status === 200 && !r.json('errors')
+    }});
+}}\
+'''
+
+WRK_SCRIPT = '''\
+-- wrk -s script.lua {endpoint}
+wrk.method = "POST"
+wrk.body = {query}
+{headers}\
+'''
+
+
+def shell_quote(text):
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def lua_quote(text):
+    characters = []
+
+    for character in text:
+        if character in '\\"':
+            characters.append('\\' + character)
+        elif ' ' <= character <= '~':
+            characters.append(character)
+        else:
+            for byte in character.encode('utf-8'):
+                characters.append(f'\\{byte:03d}')
+
+    return '"' + ''.join(characters) + '"'
+
+
+def javascript_value(value):
+    # JSON is valid JavaScript as long as line separators are escaped,
+    # which they are in ASCII output.
+    return json.dumps(value, indent=4)
+
+
+def request_headers(headers):
+    return {'content-type': 'application/json', **(headers or {})}
+
+
+def export_curl(endpoint, query, headers):
+    headers = ''.join([
+        f'     -H {shell_quote(f"{key}: {value}")} \\\n'
+        for key, value in (headers or {}).items()
+    ])
+
+    return CURL_COMMAND.format(endpoint=shell_quote(endpoint),
+                               query=shell_quote(json.dumps(query)),
+                               headers=headers)
+
+
+def export_k6(endpoint, query, headers):
+    return K6_SCRIPT.format(
+        endpoint=javascript_value(endpoint),
+        query=javascript_value(query),
+        headers=javascript_value(request_headers(headers)).replace('\n',
+                                                                   '\n    '))
+
+
+def export_wrk(endpoint, query, headers):
+    headers = '\n'.join([
+        f'wrk.headers[{lua_quote(key)}] = {lua_quote(value)}'
+        for key, value in request_headers(headers).items()
+    ])
+
+    return WRK_SCRIPT.format(endpoint=endpoint,
+                             query=lua_quote(json.dumps(query)),
+                             headers=headers)
+
+
+def export_vegeta(endpoint, query, headers):
+    target = {
+        'method': 'POST',
+        'url': endpoint,
+        'body': base64.b64encode(json.dumps(query).encode('utf-8')).decode('ascii'),
+        'header': {
+            key: [value]
+            for key, value in request_headers(headers).items()
+        }
+    }
+
+    return json.dumps(target)
+
+
+EXPORTERS = {
+    'curl': export_curl,
+    'k6': export_k6,
+    'wrk': export_wrk,
+    'vegeta': export_vegeta
+}
+
+
+def export(kind, endpoint, query, headers):
+    return EXPORTERS[kind](endpoint, query, headers)
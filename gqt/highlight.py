@@ -0,0 +1,98 @@
+import re
+
+RESET = '\x1b[0m'
+
+COLORS = {
+    'key': '\x1b[34m',
+    'string': '\x1b[32m',
+    'number': '\x1b[33m',
+    'literal': '\x1b[35m',
+    'keyword': '\x1b[35m',
+    'variable': '\x1b[36m',
+    'type': '\x1b[33m',
+    'comment': '\x1b[90m',
+    'inserted': '\x1b[32m',
+    'deleted': '\x1b[31m'
+}
+
+JSON_RE = re.compile(r'(?P<key>"(?:[^"\\]|\\.)*")(?=\s*:)'
+                     r'|(?P<string>"(?:[^"\\]|\\.)*")'
+                     r'|(?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)'
+                     r'|(?P<literal>\b(?:true|false|null)\b)')
+
+YAML_RE = re.compile(r'(?P<comment>(?<!\S)#.*$)'
+                     r'|^(?:\s*-\s)*\s*'
+                     r'(?P<key>[^\s\'"#:-][^:#]*?'
+                     r'|\'(?:[^\']|\'\')*\'|"(?:[^"\\]|\\.)*")'
+                     r'(?=:(?:\s|$))'
+                     r'|(?<=[:-] )(?P<literal>(?:true|false|null|~)(?=\s+#|\s*$))'
+                     r'|(?<=[:-] )(?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?'
+                     r'(?=\s+#|\s*$))'
+                     # Quoted scalars may contain " #", and "- " is a nested
+                     # sequence, not a plain scalar.
+                     r'|(?<=[:-] )(?P<string>(?:\'(?:[^\']|\'\')*\''
+                     r'|"(?:[^"\\]|\\.)*"'
+                     r'|(?:-(?=\S)|[^\s\'"#-]).*?)(?=\s+#|\s*$))')
+
+GRAPHQL_RE = re.compile(r'(?P<comment>#.*$)'
+                        r'|(?P<string>"(?:[^"\\]|\\.)*")'
+                        r'|(?P<keyword>\b(?:query|mutation|subscription|fragment|on)\b)'
+                        r'|(?P<literal>\b(?:true|false|null)\b)'
+                        r'|(?P<variable>\$\w+)'
+                        r'|(?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)'
+                        r'|(?P<type>\b[A-Z]\w*)')
+
+DIFF_RE = re.compile(r'^(?P<comment>#.*)'
+                     r'|^(?P<inserted>\+.*)'
+                     r'|^(?P<deleted>-.*)')
+
+LANGUAGES = {
+    'json': JSON_RE,
+    'yaml': YAML_RE,
+    'graphql': GRAPHQL_RE,
+    'diff': DIFF_RE
+}
+
+
+def colorize(match):
+    group = match.lastgroup
+    text = match.group()
+    start = match.start(group) - match.start()
+    end = match.end(group) - match.start()
+
+    return (text[:start]
+            + COLORS[group]
+            + text[start:end]
+            + RESET
+            + text[end:])
+
+
+def highlight_line(line, language):
+    return LANGUAGES[language].sub(colorize, line)
+
+
+def highlight(text, language):
+    return '\n'.join(highlight_line(line, language)
+                     for line in text.split('\n'))
+
+
+class HighlightingWriter:
+
+    def __init__(self, stream, language):
+        self.stream = stream
+        self.language = language
+        self._rest = ''
+
+    def write(self, text):
+        lines = (self._rest + text).split('\n')
+        self._rest = lines.pop()
+
+        for line in lines:
+            self.stream.write(highlight_line(line, self.language) + '\n')
+
+    def flush(self):
+        if self._rest:
+            self.stream.write(highlight_line(self._rest, self.language))
+            self._rest = ''
+
+        self.stream.flush()
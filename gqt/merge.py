@@ -0,0 +1,147 @@
+from graphql.language import DocumentNode
+from graphql.language import FieldNode
+from graphql.language import OperationDefinitionNode
+from graphql.language import SelectionSetNode
+from graphql.language import Visitor
+from graphql.language import parse
+from graphql.language import print_ast
+from graphql.language import visit
+
+from .document import get_operation
+from .document import name_node
+from .document import replace_node
+from .document import response_key
+
+
+class RenameVariables(Visitor):
+
+    def __init__(self, names):
+        super().__init__()
+        self.names = names
+
+    def enter_variable(self, node, *args):
+        name = self.names.get(node.name.value)
+
+        if name is None:
+            return None
+
+        return replace_node(node, name=name_node(name))
+
+
+class MergedQuery:
+
+    def __init__(self, query, variables, aliases):
+        self.query = query
+        self.variables = variables
+        # Query name to a dictionary of alias to original response key.
+        self.aliases = aliases
+
+    def split(self, response):
+        data = response.get('data')
+        responses = {}
+
+        for query_name, aliases in self.aliases.items():
+            if data is None:
+                query_data = None
+            else:
+                query_data = {
+                    key: data.get(alias)
+                    for alias, key in aliases.items()
+                }
+
+            responses[query_name] = {'data': query_data}
+
+        for error in response.get('errors') or []:
+            for query_name, aliases in self.aliases.items():
+                path = error.get('path')
+
+                if not path:
+                    add_error(responses[query_name], error)
+                elif path[0] in aliases:
+                    add_error(responses[query_name],
+                              {**error, 'path': [aliases[path[0]], *path[1:]]})
+
+        return responses
+
+
+def add_error(response, error):
+    response.setdefault('errors', []).append(error)
+
+
+def merge_queries(queries, variables):
+    # Merges given list of (query name, query) into one operation by
+    # prefixing root field aliases and renaming colliding variables.
+    operation_type = None
+    variable_types = {}
+    variable_definitions = []
+    selections = []
+    fragments = {}
+    merged_variables = {}
+    aliases = {}
+
+    for index, (query_name, query) in enumerate(queries, 1):
+        document = parse(query)
+        _, operation = get_operation(document)
+
+        if operation_type is None:
+            operation_type = operation.operation
+        elif operation.operation != operation_type:
+            raise Exception('Queries and mutations cannot be merged.')
+
+        names = {}
+
+        for variable_definition in operation.variable_definitions or ():
+            name = variable_definition.variable.name.value
+            variable_type = print_ast(variable_definition.type)
+            merged_name = name
+
+            if merged_name in variable_types:
+                if variable_types[merged_name] == variable_type:
+                    continue
+
+                merged_name = f'q{index}_{name}'
+                names[name] = merged_name
+                variable_definition = visit(variable_definition,
+                                            RenameVariables(names))
+
+            variable_types[merged_name] = variable_type
+            variable_definitions.append(variable_definition)
+
+            if name in variables:
+                merged_variables[merged_name] = variables[name]
+
+        aliases[query_name] = {}
+
+        for selection in operation.selection_set.selections:
+            if not isinstance(selection, FieldNode):
+                raise Exception('Only fields can be merged at the root of queries.')
+
+            key = response_key(selection)
+            alias = f'q{index}_{key}'
+            aliases[query_name][alias] = key
+            selection = replace_node(selection, alias=name_node(alias))
+            selections.append(visit(selection, RenameVariables(names)))
+
+        for definition in document.definitions:
+            if definition is operation:
+                continue
+
+            definition = visit(definition, RenameVariables(names))
+            name = definition.name.value
+
+            if name in fragments:
+                if print_ast(fragments[name]) != print_ast(definition):
+                    raise Exception(
+                        f"Fragment '{name}' is defined differently in the queries.")
+            else:
+                fragments[name] = definition
+
+    operation = OperationDefinitionNode(
+        operation=operation_type,
+        name=name_node('Merged'),
+        variable_definitions=tuple(variable_definitions),
+        directives=(),
+        selection_set=SelectionSetNode(selections=tuple(selections)))
+    document = DocumentNode(definitions=(operation, *fragments.values()))
+
+    return MergedQuery(print_ast(document), merged_variables, aliases)
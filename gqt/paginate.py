@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from graphql import value_from_ast_untyped
+from graphql.language import FieldNode
+from graphql.language import OperationType
+from graphql.language import VariableNode
+from graphql.language import parse
+from graphql.language import print_ast
+
+from .document import add_field
+from .document import add_variable
+from .document import find_field
+from .document import get_argument
+from .document import get_operation
+from .document import replace_node
+from .document import replace_operation
+from .document import response_key
+from .document import set_argument
+from .document import update_field
+from .document import variable_node
+
+CURSOR_VARIABLE = 'gqtAfter'
+
+
+class Pagination:
+
+    def __init__(self, query, path, items_key, cursor_variable, cursor):
+        self.query = query
+        self.path = path
+        self.items_key = items_key
+        self.cursor_variable = cursor_variable
+        self.cursor = cursor
+
+
+def create_pagination(query, path, variables):
+    document = parse(query)
+    index, operation = get_operation(document)
+
+    if operation.operation != OperationType.QUERY:
+        raise Exception('Only queries can be paginated.')
+
+    path = path.split('.')
+    field = find_field(operation.selection_set, path)
+
+    if field is None or field.selection_set is None:
+        raise Exception(f"No connection '{'.'.join(path)}' found in the query.")
+
+    keys = [
+        response_key(selection)
+        for selection in field.selection_set.selections
+        if isinstance(selection, FieldNode)
+    ]
+
+    if 'nodes' in keys:
+        items_key = 'nodes'
+    elif 'edges' in keys:
+        items_key = 'edges'
+    else:
+        raise Exception(
+            f"Connection '{'.'.join(path)}' has neither edges nor nodes selected.")
+
+    after = get_argument(field, 'after')
+
+    if after is not None and isinstance(after.value, VariableNode):
+        cursor_variable = after.value.name.value
+        cursor = variables.get(cursor_variable)
+    else:
+        cursor_variable = CURSOR_VARIABLE
+
+        if after is None:
+            cursor = None
+        else:
+            cursor = value_from_ast_untyped(after.value)
+
+        operation = add_variable(operation, cursor_variable, 'String')
+
+    def update(field):
+        field = set_argument(field, 'after', variable_node(cursor_variable))
+        selection_set = add_field(field.selection_set, ['pageInfo', 'hasNextPage'])
+        selection_set = add_field(selection_set, ['pageInfo', 'endCursor'])
+
+        return replace_node(field, selection_set=selection_set)
+
+    operation = replace_node(operation,
+                             selection_set=update_field(operation.selection_set,
+                                                        path,
+                                                        update))
+
+    return Pagination(print_ast(replace_operation(document, index, operation)),
+                      path,
+                      items_key,
+                      cursor_variable,
+                      cursor)
+
+
+def get_connection(data, path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+
+        data = data.get(key)
+
+    return data
+
+
+def paginate(fetch, pagination, variables, limit=None, prefetch=False):
+    # fetch(variables) returns the data of one page.
+    if prefetch:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    def fetch_page(cursor):
+        return fetch({**variables, pagination.cursor_variable: cursor})
+
+    number_of_items = 0
+    page = fetch_page(pagination.cursor)
+
+    try:
+        while True:
+            connection = get_connection(page, pagination.path)
+
+            if connection is None:
+                break
+
+            page_info = connection.get('pageInfo') or {}
+            has_next_page = (page_info.get('hasNextPage', False)
+                             and page_info.get('endCursor') is not None)
+            items = connection.get(pagination.items_key) or []
+            next_page = None
+
+            if limit is not None and number_of_items + len(items) >= limit:
+                items = items[:limit - number_of_items]
+                has_next_page = False
+
+            if has_next_page and prefetch:
+                next_page = executor.submit(fetch_page, page_info['endCursor'])
+
+            for item in items:
+                yield item
+
+            number_of_items += len(items)
+
+            if not has_next_page:
+                break
+
+            if next_page is None:
+                page = fetch_page(page_info['endCursor'])
+            else:
+                page = next_page.result()
+    finally:
+        if prefetch:
+            executor.shutdown(wait=True, cancel_futures=True)
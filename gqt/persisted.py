@@ -0,0 +1,81 @@
+import hashlib
+
+from .endpoint import create_query
+
+NOT_FOUND = 'PersistedQueryNotFound'
+NOT_SUPPORTED = 'PersistedQueryNotSupported'
+ERROR_CODES = {
+    'PERSISTED_QUERY_NOT_FOUND': NOT_FOUND,
+    'PERSISTED_QUERY_NOT_SUPPORTED': NOT_SUPPORTED
+}
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def create_persisted_query(query, variables, include_query):
+    persisted_query = {
+        'extensions': {
+            'persistedQuery': {
+                'version': 1,
+                'sha256Hash': query_hash(query)
+            }
+        }
+    }
+
+    if include_query:
+        persisted_query['query'] = query
+
+    if variables:
+        persisted_query['variables'] = variables
+
+    return persisted_query
+
+
+def persisted_query_error(response):
+    for error in response.get('errors') or []:
+        if error.get('message') in [NOT_FOUND, NOT_SUPPORTED]:
+            return error['message']
+
+        code = (error.get('extensions') or {}).get('code')
+
+        if code in ERROR_CODES:
+            return ERROR_CODES[code]
+
+    return None
+
+
+def is_executed(response):
+    # Errors raised while executing the operation have a path, and data
+    # is present once execution started.
+    if 'data' in response:
+        return True
+
+    return any('path' in error for error in response.get('errors') or [])
+
+
+def execute_persisted_query(fetch, query, variables):
+    # The hash is sent alone first, and with the query text only if the
+    # server did not execute the operation, as it does not know the hash
+    # or ignores the extension. Operations thus never run twice. Returns
+    # the response and if the hash alone was accepted.
+    response = fetch(create_persisted_query(query, variables, False))
+    error = persisted_query_error(response)
+
+    if error == NOT_SUPPORTED:
+        return fetch(create_query(query, variables)), False
+
+    if error is None and is_executed(response):
+        return response, True
+
+    response = fetch(create_persisted_query(query, variables, True))
+
+    if persisted_query_error(response) == NOT_SUPPORTED:
+        return fetch(create_query(query, variables)), False
+
+    return response, False
+
+
+def create_manifest(queries):
+    return {query_hash(query): query for query in queries}
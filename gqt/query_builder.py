@@ -50,13 +50,23 @@ class Title:
 
 class QueryBuilder:
 
-    def __init__(self, stdscr, endpoint, query_name, headers, verify, variables):
+    def __init__(self,
+                 stdscr,
+                 endpoint,
+                 query_name,
+                 headers,
+                 verify,
+                 variables,
+                 compress,
+                 policy):
         self.stdscr = stdscr
         self.endpoint = endpoint
         self.query_name = query_name
         self.headers = headers
         self.verify = verify
         self.variables = variables
+        self.compress = compress
+        self.policy = policy
 
         if self.variables:
             self.maximum_variable_length = max(len(variable)
@@ -205,7 +215,11 @@ class QueryBuilder:
         self.addstr_frame(row + 3, col, f'│ {horizontal_space} │')
         self.addstr_frame(row + 4, col, f'└─{horizontal_line}─┘')
         self.stdscr.refresh()
-        schema = fetch_schema(self.endpoint, self.headers, self.verify)
+        schema = fetch_schema(self.endpoint,
+                              self.headers,
+                              self.verify,
+                              self.compress,
+                              self.policy)
         tree = load_tree_from_schema(schema)
 
         if self.tree is not None:
@@ -409,13 +423,22 @@ def format_description(description, maximum_width):
     ]
 
 
-def selector(stdscr, endpoint, query_name, headers, verify, variables):
+def selector(stdscr,
+             endpoint,
+             query_name,
+             headers,
+             verify,
+             variables,
+             compress,
+             policy):
     return QueryBuilder(stdscr,
                         endpoint,
                         query_name,
                         headers,
                         verify,
-                        variables).run()
+                        variables,
+                        compress,
+                        policy).run()
 
 
 @contextmanager
@@ -430,11 +453,19 @@ def redirect_stdout_to_stderr():
         os.close(original_stdout)
 
 
-def query_builder(endpoint, query_name, headers, verify, variables):
+def query_builder(endpoint,
+                  query_name,
+                  headers,
+                  verify,
+                  variables,
+                  compress=False,
+                  policy=None):
     with redirect_stdout_to_stderr():
         return curses.wrapper(selector,
                               endpoint,
                               query_name,
                               headers,
                               verify,
-                              variables)
+                              variables,
+                              compress,
+                              policy)
@@ -0,0 +1,172 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+import requests
+from graphql.language import OperationType
+from graphql.language import parse
+
+from .document import get_operation
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_RETRIES = 2
+BACKOFF = 0.5
+MAX_BACKOFF = 30
+# Servers asking to wait longer are not retried.
+MAX_RETRY_AFTER = 120
+RETRY_STATUSES = [408, 429, 500, 502, 503, 504]
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def parse_retry_after(value):
+    # Retry-After is either a number of seconds or a HTTP date.
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=64)
+def is_query_text(query):
+    try:
+        _, operation = get_operation(parse(query))
+    except Exception:
+        return False
+
+    return operation.operation == OperationType.QUERY
+
+
+def is_query_request(query):
+    # Persisted queries sent as only a hash are not known to be
+    # queries.
+    if isinstance(query, list):
+        return all(is_query_request(item) for item in query)
+
+    text = query.get('query')
+
+    if not isinstance(text, str):
+        return False
+
+    return is_query_text(text)
+
+
+class RetryPolicy:
+
+    def __init__(self,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT,
+                 retries=DEFAULT_RETRIES,
+                 deadline=None,
+                 idempotent=False):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.deadline = deadline
+        self.idempotent = idempotent
+
+        if deadline is None:
+            self.end_time = None
+        else:
+            self.end_time = time.monotonic() + deadline
+
+    def remaining(self):
+        if self.end_time is None:
+            return None
+
+        remaining = self.end_time - time.monotonic()
+
+        if remaining <= 0:
+            raise DeadlineExceeded(f'Deadline of {self.deadline:g} s exceeded.')
+
+        return remaining
+
+    def timeout(self):
+        # Timeouts are shortened to not pass the deadline.
+        remaining = self.remaining()
+        connect_timeout = self.connect_timeout
+        read_timeout = self.read_timeout
+
+        if remaining is not None:
+            if connect_timeout is None or connect_timeout > remaining:
+                connect_timeout = remaining
+
+            if read_timeout is None or read_timeout > remaining:
+                read_timeout = remaining
+
+        return connect_timeout, read_timeout
+
+    def delay(self, attempt, retry_after):
+        # Exponential backoff with full jitter, unless the server says
+        # when to retry. None if there is no time left to retry or the
+        # server asks to wait too long.
+        if retry_after is None:
+            delay = random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2 ** attempt))
+        elif retry_after > MAX_RETRY_AFTER:
+            return None
+        else:
+            delay = retry_after
+
+        if self.end_time is not None:
+            if time.monotonic() + delay >= self.end_time:
+                return None
+
+        return delay
+
+
+def send_with_retries(send, policy, query):
+    # send(timeout) sends a request and returns its HTTP response.
+    # Only queries and, if the policy says so, other operations are
+    # retried, as mutations may have had effects before failing.
+    retryable = policy.idempotent or is_query_request(query)
+    attempt = 0
+
+    while True:
+        response = None
+        retry_after = None
+        error = None
+
+        try:
+            response = send(policy.timeout())
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout) as send_error:
+            # Timeouts shortened by the deadline are reported as such.
+            policy.remaining()
+
+            if not retryable or attempt >= policy.retries:
+                raise
+
+            error = send_error
+        else:
+            if (response.status_code not in RETRY_STATUSES
+                    or not retryable
+                    or attempt >= policy.retries):
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+        delay = policy.delay(attempt, retry_after)
+
+        if delay is None:
+            if error is not None:
+                raise error
+
+            return response
+
+        if response is not None:
+            response.close()
+
+        time.sleep(delay)
+        attempt += 1
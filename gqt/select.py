@@ -0,0 +1,255 @@
+import json
+import operator
+import re
+
+from .stream import build_value
+from .stream import skip_value
+
+TOKEN_RE = re.compile(r'\s*(?:(?P<name>[A-Za-z_][A-Za-z0-9_]*)'
+                      r'|(?P<number>-?[0-9]+(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)'
+                      r'|(?P<string>"(?:[^"\\]|\\.)*")'
+                      r'|(?P<operator>==|!=|<=|>=|<|>)'
+                      r'|(?P<punct>[.\[\]*?]))')
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+
+LITERALS = {
+    'true': True,
+    'false': False,
+    'null': None
+}
+
+
+class Key:
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Index:
+
+    def __init__(self, index):
+        self.index = index
+
+
+class Wildcard:
+    pass
+
+
+class Filter:
+
+    def __init__(self, path, compare, value):
+        self.path = path
+        self.compare = compare
+        self.value = value
+
+    def matches(self, item):
+        for key in self.path:
+            if not isinstance(item, dict):
+                return False
+
+            item = item.get(key)
+
+        if self.compare is None:
+            return bool(item)
+
+        try:
+            return self.compare(item, self.value)
+        except TypeError:
+            return False
+
+
+class Tokens:
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = []
+        pos = 0
+        expression = expression.rstrip()
+
+        while pos < len(expression):
+            match = TOKEN_RE.match(expression, pos)
+
+            if match is None:
+                self.error()
+
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            pos = match.end()
+
+        self.tokens.append((None, None))
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def next(self):
+        token = self.tokens[self.index]
+
+        if token[0] is not None:
+            self.index += 1
+
+        return token
+
+    def expect(self, kind, value=None):
+        token = self.next()
+
+        if token[0] != kind or (value is not None and token[1] != value):
+            self.error()
+
+        return token[1]
+
+    def error(self):
+        raise Exception(f"Invalid select expression '{self.expression}'.")
+
+
+def parse_filter(tokens):
+    path = [tokens.expect('name')]
+
+    while tokens.peek() == ('punct', '.'):
+        tokens.next()
+        path.append(tokens.expect('name'))
+
+    if tokens.peek()[0] != 'operator':
+        return Filter(path, None, None)
+
+    compare = OPERATORS[tokens.next()[1]]
+    kind, text = tokens.next()
+
+    if kind in ['number', 'string']:
+        value = json.loads(text)
+    elif kind == 'name' and text in LITERALS:
+        value = LITERALS[text]
+    else:
+        tokens.error()
+
+    return Filter(path, compare, value)
+
+
+def parse_bracket(tokens):
+    kind, text = tokens.next()
+
+    if kind == 'number':
+        step = Index(int(text))
+    elif (kind, text) == ('punct', '*'):
+        step = Wildcard()
+    elif (kind, text) == ('punct', '?'):
+        step = parse_filter(tokens)
+    else:
+        tokens.error()
+
+    tokens.expect('punct', ']')
+
+    return step
+
+
+def parse_select(expression):
+    # For example repository.issues.nodes[?state == "OPEN"].title.
+    tokens = Tokens(expression)
+    steps = []
+
+    if tokens.peek() == ('punct', '.'):
+        tokens.next()
+
+    if tokens.peek()[0] == 'name':
+        steps.append(Key(tokens.next()[1]))
+
+    while True:
+        kind, text = tokens.next()
+
+        if kind is None:
+            break
+        elif (kind, text) == ('punct', '.'):
+            kind, text = tokens.next()
+
+            if kind == 'name':
+                steps.append(Key(text))
+            elif (kind, text) == ('punct', '*'):
+                steps.append(Wildcard())
+            else:
+                tokens.error()
+        elif (kind, text) == ('punct', '['):
+            steps.append(parse_bracket(tokens))
+        else:
+            tokens.error()
+
+    return steps
+
+
+def select_values(value, steps, emit):
+    if not steps:
+        emit(value)
+
+        return
+
+    step = steps[0]
+    steps = steps[1:]
+
+    if isinstance(step, Key):
+        if isinstance(value, dict) and step.name in value:
+            select_values(value[step.name], steps, emit)
+    elif isinstance(step, Index):
+        if isinstance(value, list) and -len(value) <= step.index < len(value):
+            select_values(value[step.index], steps, emit)
+    elif isinstance(step, Wildcard):
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, list):
+            return
+
+        for item in value:
+            select_values(item, steps, emit)
+    elif isinstance(value, list):
+        for item in value:
+            if step.matches(item):
+                select_values(item, steps, emit)
+
+
+def select_events(events, event, value, steps, emit):
+    if not steps:
+        emit(build_value(events, event, value))
+
+        return
+
+    step = steps[0]
+
+    if isinstance(step, Index) and step.index < 0:
+        # Negative indexes need the whole list.
+        select_values(build_value(events, event, value), steps, emit)
+    elif event == 'start_map':
+        for key_event, key in events:
+            if key_event == 'end_map':
+                break
+
+            if (isinstance(step, Wildcard)
+                    or (isinstance(step, Key) and key == step.name)):
+                select_events(events, *next(events), steps[1:], emit)
+            else:
+                skip_value(events, *next(events))
+    elif event == 'start_array':
+        index = 0
+
+        for item_event, item_value in events:
+            if item_event == 'end_array':
+                break
+
+            if (isinstance(step, Wildcard)
+                    or (isinstance(step, Index) and index == step.index)):
+                select_events(events, item_event, item_value, steps[1:], emit)
+            elif isinstance(step, Filter):
+                item = build_value(events, item_event, item_value)
+
+                if step.matches(item):
+                    select_values(item, steps[1:], emit)
+            else:
+                skip_value(events, item_event, item_value)
+
+            index += 1
+    else:
+        skip_value(events, event, value)
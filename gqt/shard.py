@@ -0,0 +1,189 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from graphql import value_from_ast_untyped
+from graphql.language import OperationType
+from graphql.language import VariableNode
+from graphql.language import parse
+from graphql.language import print_ast
+
+from .document import add_variable
+from .document import find_field
+from .document import get_argument
+from .document import get_operation
+from .document import replace_node
+from .document import replace_operation
+from .document import set_argument
+from .document import update_field
+from .document import variable_node
+
+OFFSET_ARGUMENTS = ['offset', 'skip']
+LIMIT_ARGUMENTS = ['limit', 'first', 'take']
+
+
+class Sharding:
+
+    def __init__(self, query, path, offset_variable, limit_variable, offset, limit):
+        self.query = query
+        self.path = path
+        self.offset_variable = offset_variable
+        self.limit_variable = limit_variable
+        self.offset = offset
+        self.limit = limit
+
+    def ranges(self, number_of_shards):
+        shard_size = max(-(-self.limit // number_of_shards), 1)
+
+        return [
+            (offset, min(shard_size, self.offset + self.limit - offset))
+            for offset in range(self.offset,
+                                self.offset + self.limit,
+                                shard_size)
+        ]
+
+
+def find_argument(field, names):
+    for name in names:
+        argument = get_argument(field, name)
+
+        if argument is not None:
+            return argument
+
+    return None
+
+
+def argument_value(argument, variables):
+    if isinstance(argument.value, VariableNode):
+        return argument.value.name.value, variables.get(argument.value.name.value)
+    else:
+        return None, value_from_ast_untyped(argument.value)
+
+
+def create_sharding(query, path, variables):
+    document = parse(query)
+    index, operation = get_operation(document)
+
+    if operation.operation != OperationType.QUERY:
+        raise Exception('Only queries can be sharded.')
+
+    path = path.split('.')
+    field = find_field(operation.selection_set, path)
+
+    if field is None:
+        raise Exception(f"No field '{'.'.join(path)}' found in the query.")
+
+    offset_argument = find_argument(field, OFFSET_ARGUMENTS)
+    limit_argument = find_argument(field, LIMIT_ARGUMENTS)
+
+    if offset_argument is None or limit_argument is None:
+        raise Exception(
+            f"Field '{'.'.join(path)}' must have an offset argument "
+            f"({', '.join(OFFSET_ARGUMENTS)}) and a limit argument "
+            f"({', '.join(LIMIT_ARGUMENTS)}).")
+
+    offset_variable, offset = argument_value(offset_argument, variables)
+    limit_variable, limit = argument_value(limit_argument, variables)
+
+    if offset is None:
+        offset = 0
+
+    if not isinstance(offset, int) or not isinstance(limit, int):
+        raise Exception('Offset and limit must be integers.')
+
+    if limit <= 0:
+        raise Exception(f'Limit must be positive, not {limit}.')
+
+    if offset_variable is None:
+        offset_variable = 'gqtOffset'
+        operation = add_variable(operation, offset_variable, 'Int')
+
+    if limit_variable is None:
+        limit_variable = 'gqtLimit'
+        operation = add_variable(operation, limit_variable, 'Int')
+
+    def update(field):
+        field = set_argument(field,
+                             offset_argument.name.value,
+                             variable_node(offset_variable))
+
+        return set_argument(field,
+                            limit_argument.name.value,
+                            variable_node(limit_variable))
+
+    operation = replace_node(operation,
+                             selection_set=update_field(operation.selection_set,
+                                                        path,
+                                                        update))
+
+    return Sharding(print_ast(replace_operation(document, index, operation)),
+                    path,
+                    offset_variable,
+                    limit_variable,
+                    offset,
+                    limit)
+
+
+def get_items(data, path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+
+        data = data.get(key)
+
+    return data
+
+
+def set_items(data, path, items):
+    for key in path[:-1]:
+        data = data[key]
+
+    data[path[-1]] = items
+
+
+def fetch_shard(fetch, sharding, variables, offset, limit):
+    # Servers may return fewer items than asked for, so keep asking
+    # for the rest until the shard is full or an empty list is returned.
+    items = []
+    data = None
+
+    while len(items) < limit:
+        data = fetch({
+            **variables,
+            sharding.offset_variable: offset + len(items),
+            sharding.limit_variable: limit - len(items)
+        })
+        page = get_items(data, sharding.path)
+
+        if not page:
+            break
+
+        items += page
+
+    return data, items
+
+
+def fetch_shards(fetch, sharding, variables, number_of_shards, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(fetch_shard,
+                            fetch,
+                            sharding,
+                            variables,
+                            offset,
+                            limit)
+            for offset, limit in sharding.ranges(number_of_shards)
+        ]
+        data = None
+        items = []
+
+        for future in futures:
+            shard_data, shard_items = future.result()
+
+            if data is None:
+                data = shard_data
+
+            items += shard_items
+
+    if data is not None and get_items(data, sharding.path) is not None:
+        set_items(data, sharding.path, items)
+
+    return data
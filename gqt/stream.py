@@ -0,0 +1,375 @@
+import codecs
+import json
+import re
+
+import yaml
+
+from .codec import dumps
+
+CHUNK_SIZE = 65536
+
+TOKEN_RE = re.compile(r'[ \t\n\r]*(?:'
+                      r'(?P<punct>[{}\[\],:])'
+                      r'|"(?P<string>[^"\\]*(?:\\.[^"\\]*)*)"'
+                      r'|(?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)'
+                      r'|(?P<literal>true|false|null))',
+                      re.DOTALL)
+
+NUMBER_TAIL_RE = re.compile(r'[0-9.eE+-]*')
+
+RAW_TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\],:]|[^\s"{}\[\],:]+',
+                          re.DOTALL)
+
+QUOTE = ord('"')
+
+OPENING_BRACKETS = b'{['
+
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+LITERALS = {
+    'true': True,
+    'false': False,
+    'null': None
+}
+
+
+def make_token(match):
+    kind = match.lastgroup
+    text = match.group(kind)
+
+    if kind == 'punct':
+        return text, None
+    elif kind == 'string':
+        if '\\' in text:
+            text = json.loads(f'"{text}"')
+
+        return 'value', text
+    elif kind == 'number':
+        if '.' in text or 'e' in text or 'E' in text:
+            return 'value', float(text)
+        else:
+            return 'value', int(text)
+    else:
+        return 'value', LITERALS[text]
+
+
+def iter_tokens(chunks):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        pos = 0
+
+        while True:
+            match = TOKEN_RE.match(buffer, pos)
+
+            if match is None:
+                break
+
+            # Tokens may continue in the next chunk.
+            if match.lastgroup == 'number':
+                if NUMBER_TAIL_RE.fullmatch(buffer, match.end()):
+                    break
+            elif match.end() == len(buffer):
+                break
+
+            pos = match.end()
+
+            yield make_token(match)
+
+        buffer = buffer[pos:]
+
+    buffer += decoder.decode(b'', True)
+    pos = 0
+
+    while True:
+        match = TOKEN_RE.match(buffer, pos)
+
+        if match is None:
+            break
+
+        pos = match.end()
+
+        yield make_token(match)
+
+    if buffer[pos:].strip():
+        raise Exception(f"Invalid JSON near '{buffer[pos:pos + 20]}'.")
+
+
+def iter_events(chunks):
+    # Yields (event, value) pairs. Events are start_map, map_key,
+    # end_map, start_array, end_array and value.
+    containers = []
+    state = 'value'
+
+    for token, value in iter_tokens(chunks):
+        if state in ['value', 'value_or_end']:
+            if token == 'value':
+                yield token, value
+            elif token == '{':
+                yield 'start_map', None
+                containers.append('}')
+                state = 'key_or_end'
+                continue
+            elif token == '[':
+                yield 'start_array', None
+                containers.append(']')
+                state = 'value_or_end'
+                continue
+            elif token == ']' and state == 'value_or_end':
+                containers.pop()
+                yield 'end_array', None
+            else:
+                raise Exception(f"Unexpected '{token}' in JSON.")
+        elif state in ['key', 'key_or_end']:
+            if token == 'value' and isinstance(value, str):
+                yield 'map_key', value
+                state = 'colon'
+                continue
+            elif token == '}' and state == 'key_or_end':
+                containers.pop()
+                yield 'end_map', None
+            else:
+                raise Exception('Expected a key in JSON object.')
+        elif state == 'colon':
+            if token != ':':
+                raise Exception("Expected ':' in JSON object.")
+
+            state = 'value'
+            continue
+        elif state == 'comma_or_end':
+            if token == ',':
+                if containers[-1] == '}':
+                    state = 'key'
+                else:
+                    state = 'value'
+
+                continue
+            elif token == containers[-1]:
+                containers.pop()
+
+                if token == '}':
+                    yield 'end_map', None
+                else:
+                    yield 'end_array', None
+            else:
+                raise Exception(f"Unexpected '{token}' in JSON.")
+        else:
+            raise Exception('Trailing data after JSON value.')
+
+        if containers:
+            state = 'comma_or_end'
+        else:
+            state = 'done'
+
+    if state != 'done':
+        raise Exception('Unexpected end of JSON.')
+
+
+def build_value(events, event, value):
+    if event == 'value':
+        return value
+    elif event == 'start_map':
+        result = {}
+
+        for event, key in events:
+            if event == 'end_map':
+                return result
+
+            result[key] = build_value(events, *next(events))
+    elif event == 'start_array':
+        result = []
+
+        for event, value in events:
+            if event == 'end_array':
+                return result
+
+            result.append(build_value(events, event, value))
+
+    raise Exception(f"Unexpected '{event}' in JSON.")
+
+
+def skip_value(events, event, _value):
+    if event == 'value':
+        return
+
+    depth = 1
+
+    for event, _ in events:
+        if event in ['start_map', 'start_array']:
+            depth += 1
+        elif event in ['end_map', 'end_array']:
+            depth -= 1
+
+            if depth == 0:
+                return
+
+
+def parse_response(events, data_handler):
+    errors = None
+
+    if next(events, (None, None))[0] != 'start_map':
+        raise Exception('Response is not a JSON object.')
+
+    for event, key in events:
+        if event == 'end_map':
+            break
+
+        if key == 'errors':
+            errors = build_value(events, *next(events))
+        elif key == 'data' and not errors:
+            data_handler(events, *next(events))
+        else:
+            skip_value(events, *next(events))
+
+    return errors
+
+
+def write_json(events, event, value, write, indent=''):
+    if event == 'start_map':
+        inner_indent = indent + '    '
+        is_empty = True
+
+        for event, key in events:
+            if event == 'end_map':
+                break
+
+            if is_empty:
+                write('{\n')
+                is_empty = False
+            else:
+                write(',\n')
+
+            write(f'{inner_indent}{dumps(key)}: ')
+            write_json(events, *next(events), write, inner_indent)
+
+        if is_empty:
+            write('{}')
+        else:
+            write(f'\n{indent}}}')
+    elif event == 'start_array':
+        inner_indent = indent + '    '
+        is_empty = True
+
+        for event, value in events:
+            if event == 'end_array':
+                break
+
+            if is_empty:
+                write('[\n')
+                is_empty = False
+            else:
+                write(',\n')
+
+            write(inner_indent)
+            write_json(events, event, value, write, inner_indent)
+
+        if is_empty:
+            write('[]')
+        else:
+            write(f'\n{indent}]')
+    else:
+        write(dumps(value))
+
+
+def make_yaml_scalar_event(dumper, value):
+    node = dumper.represent_data(value)
+    implicit = (
+        node.tag == dumper.resolve(yaml.ScalarNode, node.value, (True, False)),
+        node.tag == dumper.resolve(yaml.ScalarNode, node.value, (False, True))
+    )
+
+    return yaml.ScalarEvent(None, node.tag, implicit, node.value, style=node.style)
+
+
+def iter_yaml_events(dumper, events, event, value):
+    # Same events as the serializer creates from the represented value.
+    if event == 'start_map':
+        yield yaml.MappingStartEvent(None, None, True, flow_style=False)
+
+        for event, key in events:
+            if event == 'end_map':
+                break
+
+            yield make_yaml_scalar_event(dumper, key)
+            yield from iter_yaml_events(dumper, events, *next(events))
+
+        yield yaml.MappingEndEvent()
+    elif event == 'start_array':
+        yield yaml.SequenceStartEvent(None, None, True, flow_style=False)
+
+        for event, value in events:
+            if event == 'end_array':
+                break
+
+            yield from iter_yaml_events(dumper, events, event, value)
+
+        yield yaml.SequenceEndEvent()
+    else:
+        yield make_yaml_scalar_event(dumper, value)
+
+
+def write_yaml(events, event, value, stream):
+    dumper = YAML_DUMPER(stream, allow_unicode=True, sort_keys=False)
+    dumper.emit(yaml.StreamStartEvent())
+    dumper.emit(yaml.DocumentStartEvent(explicit=False))
+
+    for yaml_event in iter_yaml_events(dumper, events, event, value):
+        dumper.emit(yaml_event)
+
+    dumper.emit(yaml.DocumentEndEvent(explicit=False))
+    dumper.emit(yaml.StreamEndEvent())
+
+
+class ErrorsScanner:
+    # Finds out if a response has a non-empty errors array in its top
+    # level object without parsing it.
+
+    def __init__(self):
+        self.has_errors = False
+        self._depth = 0
+        self._rest = b''
+        self._object = False
+        self._key = False
+        self._state = None
+
+    def feed(self, chunk):
+        data = self._rest + chunk
+        self._rest = b''
+
+        for match in RAW_TOKEN_RE.finditer(data):
+            token = match.group()
+
+            if token[0] == QUOTE and match.group(1) is None:
+                # The string continues in the next chunk.
+                self._rest = data[match.start():]
+                break
+
+            # The state is the next expected part of an errors member.
+            if self._state == 'colon':
+                self._state = 'value'
+            elif self._state == 'value':
+                if token == b'[':
+                    self._state = 'item'
+                else:
+                    self._state = None
+            elif self._state == 'item':
+                if token != b']':
+                    self.has_errors = True
+
+                self._state = None
+            elif self._key and token == b'"errors"':
+                self._state = 'colon'
+
+            if token[0] in OPENING_BRACKETS:
+                if self._depth == 0:
+                    self._object = token == b'{'
+
+                self._depth += 1
+            elif token in [b'}', b']']:
+                self._depth -= 1
+
+            self._key = (self._depth == 1
+                         and self._object
+                         and token in [b'{', b','])
@@ -0,0 +1,152 @@
+import csv
+import sqlite3
+import sys
+
+from .codec import dumps
+
+
+def flatten(value, row=None, prefix=''):
+    if row is None:
+        row = {}
+
+        if not isinstance(value, dict):
+            value = {'value': value}
+
+    for key, item in value.items():
+        key = prefix + key
+
+        if isinstance(item, dict) and item:
+            flatten(item, row, key + '.')
+        elif isinstance(item, (dict, list)):
+            row[key] = dumps(item)
+        else:
+            row[key] = item
+
+    return row
+
+
+def quote_identifier(name):
+    name = name.replace('"', '""')
+
+    return f'"{name}"'
+
+
+def format_csv_value(value):
+    if value is None:
+        return ''
+    elif value is True:
+        return 'true'
+    elif value is False:
+        return 'false'
+    else:
+        return value
+
+
+class CsvWriter:
+
+    def __init__(self, stream, delimiter, buffer_size=1000):
+        self.stream = stream
+        self.delimiter = delimiter
+        self.buffer_size = buffer_size
+        self._writer = None
+        self._columns = {}
+        self._rows = []
+        self._dropped = set()
+
+    def write(self, value):
+        row = flatten(value)
+
+        if self._writer is None:
+            # Columns are collected from the first rows, as the header
+            # must be written before them.
+            self._columns.update(dict.fromkeys(row))
+            self._rows.append(row)
+
+            if len(self._rows) >= self.buffer_size:
+                self._flush()
+        else:
+            self._write_row(row)
+
+    def _flush(self):
+        self._writer = csv.DictWriter(self.stream,
+                                      list(self._columns),
+                                      delimiter=self.delimiter,
+                                      extrasaction='ignore',
+                                      lineterminator='\n')
+        self._writer.writeheader()
+
+        for row in self._rows:
+            self._write_row(row)
+
+        self._rows = []
+
+    def _write_row(self, row):
+        for key, item in row.items():
+            if (item is not None
+                    and key not in self._columns
+                    and key not in self._dropped):
+                self._dropped.add(key)
+                print(f"warning: Column '{key}' not in the header, dropped.",
+                      file=sys.stderr)
+
+        self._writer.writerow({
+            key: format_csv_value(item)
+            for key, item in row.items()
+        })
+
+    def close(self):
+        if self._writer is None and self._rows:
+            self._flush()
+
+        self.stream.flush()
+
+
+class SqliteWriter:
+
+    def __init__(self, path, table, batch_size=1000):
+        self.table = quote_identifier(table)
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path)
+        self._columns = None
+        self._rows = []
+
+    def write(self, value):
+        row = flatten(value)
+
+        if self._columns is None:
+            self._columns = list(row)
+            columns = ', '.join(quote_identifier(column) for column in self._columns)
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ({columns})')
+        elif not row.keys() <= set(self._columns):
+            self._flush()
+
+            for column in row:
+                if column not in self._columns:
+                    self._connection.execute(
+                        f'ALTER TABLE {self.table} '
+                        f'ADD COLUMN {quote_identifier(column)}')
+                    self._columns.append(column)
+
+        self._rows.append(tuple(row.get(column) for column in self._columns))
+
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+
+        columns = ', '.join(quote_identifier(column) for column in self._columns)
+        values = ', '.join('?' for _ in self._columns)
+
+        with self._connection:
+            self._connection.executemany(
+                f'INSERT INTO {self.table} ({columns}) VALUES ({values})',
+                self._rows)
+
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        self._connection.close()
@@ -1661,6 +1661,9 @@ class Tree:
         self._state = state
         self._cursor = root.fields[0]
 
+    def schema(self):
+        return self._schema
+
     def cursor_type(self):
         if self._cursor is None:
             return ''
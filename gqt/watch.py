@@ -0,0 +1,90 @@
+import random
+import time
+
+from .codec import dumps
+
+MISSING = object()
+
+
+def format_path(path):
+    text = ''
+
+    for key in path:
+        if isinstance(key, int):
+            text += f'[{key}]'
+        elif text:
+            text += f'.{key}'
+        else:
+            text += key
+
+    return text
+
+
+def diff(old, new, path=()):
+    # Yields (path, old, new) for each changed value, with MISSING for
+    # added and removed values.
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in old.items():
+            yield from diff(value, new.get(key, MISSING), path + (key,))
+
+        for key, value in new.items():
+            if key not in old:
+                yield path + (key,), MISSING, value
+    elif isinstance(old, list) and isinstance(new, list):
+        for index in range(max(len(old), len(new))):
+            yield from diff(old[index] if index < len(old) else MISSING,
+                            new[index] if index < len(new) else MISSING,
+                            path + (index,))
+    elif old != new or type(old) is not type(new):
+        yield path, old, new
+
+
+def format_diff(old, new):
+    lines = []
+
+    for path, old_value, new_value in diff(old, new):
+        path = format_path(path)
+
+        if old_value is not MISSING:
+            lines.append(f'- {path}: {dumps(old_value)}')
+
+        if new_value is not MISSING:
+            lines.append(f'+ {path}: {dumps(new_value)}')
+
+    return '\n'.join(lines)
+
+
+def watch(fetch,
+          interval,
+          show_first,
+          show_diff,
+          show_errors,
+          jitter=0.1,
+          iterations=None):
+    # fetch() returns None if the response is unchanged since the
+    # previous call. Only data is compared, and the errors of each new
+    # response are given to show_errors(). Jitter spreads the requests
+    # of many watchers.
+    previous = MISSING
+    iteration = 0
+
+    while True:
+        response = fetch()
+
+        if response is not None:
+            show_errors(response.get('errors') or [])
+            data = response.get('data')
+
+            if previous is MISSING:
+                show_first(data)
+            elif data != previous:
+                show_diff(format_diff(previous, data))
+
+            previous = data
+
+        iteration += 1
+
+        if iteration == iterations:
+            break
+
+        time.sleep(interval * random.uniform(1 - jitter, 1 + jitter))
@@ -25,8 +25,13 @@ setuptools.setup(
         'pyyaml',
         'readlike',
         'graphql-core',
-        'tabulate'
+        'tabulate',
+        'urllib3>=2'
     ],
+    extras_require={
+        'fast': ['orjson'],
+        'compression': ['brotli', 'zstandard']
+    },
     packages=find_packages(exclude=['tests']),
     test_suite="tests",
       entry_points = {
@@ -0,0 +1,72 @@
+import unittest
+from array import array
+
+from gqt.aggregate import Aggregator
+from gqt.aggregate import FieldStatistics
+from gqt.aggregate import parse_aggregate
+
+ROWS = [
+    {'state': 'OPEN', 'size': 1, 'owner': {'login': 'a'}},
+    {'state': 'OPEN', 'size': 3, 'owner': {'login': 'b'}},
+    {'state': 'CLOSED', 'size': 10, 'owner': None},
+    {'state': 'OPEN', 'size': None, 'owner': {'login': 'a'}},
+    {'state': 'CLOSED', 'size': 20, 'owner': {'login': 'a'}}
+]
+
+
+def aggregate(aggregates, group_by=None, rows=ROWS):
+    aggregator = Aggregator([parse_aggregate(aggregate) for aggregate in aggregates],
+                            group_by)
+
+    for row in rows:
+        aggregator.add(row)
+
+    return aggregator.headers(), aggregator.rows()
+
+
+class AggregateTest(unittest.TestCase):
+
+    def test_aggregate(self):
+        self.assertEqual(
+            aggregate(['count', 'count:size', 'sum:size', 'min:size',
+                       'max:size', 'mean:size', 'p50:size', 'p100:size']),
+            (['count', 'count(size)', 'sum(size)', 'min(size)', 'max(size)',
+              'mean(size)', 'p50(size)', 'p100(size)'],
+             [[5, 4, 34, 1, 20, 8.5, 6.5, 20.0]]))
+
+    def test_group_by(self):
+        self.assertEqual(
+            aggregate(['count', 'sum:size', 'p0:size'], 'state'),
+            (['state', 'count', 'sum(size)', 'p0(size)'],
+             [['OPEN', 3, 4, 1.0], ['CLOSED', 2, 30, 10.0]]))
+        self.assertEqual(
+            aggregate(['count'], 'owner.login'),
+            (['owner.login', 'count'], [['a', 3], ['b', 1], [None, 1]]))
+
+    def test_percentile_after_add(self):
+        statistics = FieldStatistics(True)
+
+        for value in [3, 1, 2]:
+            statistics.add(value)
+
+        self.assertEqual(statistics.percentile(0), 1.0)
+        self.assertIsInstance(statistics.values, array)
+        statistics.add(0)
+        self.assertEqual(statistics.percentile(0), 0.0)
+        self.assertEqual(statistics.percentile(100), 3.0)
+
+    def test_no_rows(self):
+        self.assertEqual(aggregate(['count', 'mean', 'p90'], rows=[]),
+                         (['count', 'mean', 'p90'], [[0, None, None]]))
+
+    def test_invalid(self):
+        datas = [
+            ('', "Invalid aggregate ''."),
+            ('median', "Invalid aggregate 'median'."),
+            ('p101', "Invalid percentile 'p101'."),
+            ('sum:', "Invalid aggregate 'sum:'.")
+        ]
+
+        for text, message in datas:
+            with self.assertRaisesRegex(Exception, message):
+                parse_aggregate(text)
@@ -0,0 +1,108 @@
+import io
+import threading
+import time
+import unittest
+
+from gqt.batch import TokenBucket
+from gqt.batch import read_variables
+from gqt.batch import run_batch
+from gqt.batch import run_named
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_read_variables(self):
+        fin = io.StringIO('{"a": 1}\n\n{"a": 2}\n')
+
+        self.assertEqual(list(read_variables(fin)), [(1, {'a': 1}), (3, {'a': 2})])
+
+    def test_read_variables_invalid(self):
+        with self.assertRaises(Exception) as cm:
+            list(read_variables(io.StringIO('{"a": 1}\n[1]\n')))
+
+        self.assertEqual(str(cm.exception), 'Line 2 is not a JSON object.')
+
+        with self.assertRaises(Exception) as cm:
+            list(read_variables(io.StringIO('{"a"\n')))
+
+        self.assertEqual(str(cm.exception), 'Invalid JSON on line 1.')
+
+    def test_ordered(self):
+        def execute(variables):
+            # Later requests complete first.
+            time.sleep(0.01 * (10 - variables['n']))
+
+            return variables['n']
+
+        results = []
+        run_batch(execute,
+                  ((n, {'n': n}) for n in range(10)),
+                  4,
+                  None,
+                  True,
+                  lambda index, result: results.append((index, result)))
+
+        self.assertEqual(results, [(n, n) for n in range(10)])
+
+    def test_unordered(self):
+        released = threading.Event()
+
+        def execute(variables):
+            if variables['n'] == 0:
+                released.wait(5)
+
+            return variables['n']
+
+        results = []
+
+        def emit(index, result):
+            results.append(index)
+
+            if len(results) == 4:
+                released.set()
+
+        run_batch(execute, ((n, {'n': n}) for n in range(5)), 2, None, False, emit)
+
+        self.assertEqual(sorted(results), list(range(5)))
+        self.assertNotEqual(results[0], 0)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(100)
+        start_time = time.monotonic()
+
+        for _ in range(11):
+            bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.09)
+
+    def test_run_named(self):
+        def execute(name):
+            # The first name completes last.
+            if name == 'a':
+                time.sleep(0.05)
+
+            return {'data': name}
+
+        responses = run_named(execute, ['a', 'b', 'c'], 3, False)
+
+        self.assertEqual(list(responses.items()),
+                         [
+                             ('a', {'data': 'a'}),
+                             ('b', {'data': 'b'}),
+                             ('c', {'data': 'c'})
+                         ])
+
+    def test_run_named_fail_fast(self):
+        def execute(name):
+            if name == 'b':
+                return {'errors': [{'message': 'Boom.'}]}
+
+            return {'data': name}
+
+        self.assertEqual(run_named(execute, ['a', 'b'], 2, False)['b'],
+                         {'errors': [{'message': 'Boom.'}]})
+
+        with self.assertRaises(Exception) as cm:
+            run_named(execute, ['a', 'b'], 2, True)
+
+        self.assertEqual(str(cm.exception), "Query 'b' failed: Boom.")
@@ -0,0 +1,42 @@
+import unittest
+
+from gqt.bench import format_report
+from gqt.bench import run_bench
+
+
+class BenchTest(unittest.TestCase):
+
+    def test_iterations(self):
+        calls = []
+
+        def execute():
+            calls.append(None)
+
+            if len(calls) % 5 == 0:
+                raise Exception('HTTP status 503')
+
+            return 100, len(calls) % 5 == 1
+
+        report = run_bench(execute, 20, None, 3).report()
+
+        self.assertEqual(len(calls), 20)
+        self.assertEqual(report['requests'], 20)
+        self.assertEqual(report['graphql_errors'], 4)
+        self.assertEqual(report['request_errors'], {'HTTP status 503': 4})
+        self.assertEqual(report['response_bytes'], {'total': 1600, 'mean': 100})
+        self.assertLessEqual(report['latency_ms']['p50'],
+                             report['latency_ms']['max'])
+        self.assertIn('Request errors  4', format_report(report))
+
+    def test_duration(self):
+        report = run_bench(lambda: (1, False), 0, 0.05, 2).report()
+
+        self.assertGreater(report['requests'], 0)
+        self.assertGreaterEqual(report['duration'], 0.05)
+
+    def test_no_requests(self):
+        report = run_bench(lambda: (1, False), 0, None, 2).report()
+
+        self.assertEqual(report['requests'], 0)
+        self.assertEqual(report['latency_ms']['p99'], None)
+        self.assertIn('Latency p99     -', format_report(report))
@@ -0,0 +1,155 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from gqt.bulk import AdaptiveConcurrency
+from gqt.bulk import Checkpoint
+from gqt.bulk import OverloadedError
+from gqt.bulk import get_variable_types
+from gqt.bulk import read_rows
+from gqt.bulk import run_bulk
+from gqt.retry import RetryPolicy
+
+
+class BulkTest(unittest.TestCase):
+
+    def test_read_rows(self):
+        variable_types = get_variable_types(
+            'mutation M($a: Int!, $b: String, $c: Boolean, $d: [Int!]) {x}')
+        fin = io.StringIO('a,b,c,d\n1,,true,"[1, 2]"\n,x,0,\n')
+
+        self.assertEqual(list(read_rows(fin, variable_types)),
+                         [
+                             (1, {'a': 1, 'b': '', 'c': True, 'd': [1, 2]}),
+                             (2, {'a': None, 'b': 'x', 'c': False, 'd': None})
+                         ])
+
+    def test_read_rows_unknown_column(self):
+        with self.assertRaises(Exception) as cm:
+            list(read_rows(io.StringIO('a,e\n1,2\n'), {'a': 'Int'}))
+
+        self.assertEqual(str(cm.exception),
+                         "CSV column 'e' is not a variable in the query. "
+                         "Variables are: a.")
+
+    def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint')
+            checkpoint = Checkpoint(path)
+
+            for row_number in [2, 1, 5]:
+                checkpoint.mark_done(row_number)
+
+            checkpoint.save()
+            checkpoint = Checkpoint(path)
+
+            self.assertEqual(checkpoint.completed, 2)
+            self.assertEqual(checkpoint.done, {5})
+            self.assertEqual(
+                [row_number for row_number in range(1, 7)
+                 if not checkpoint.is_done(row_number)],
+                [3, 4, 6])
+
+    @patch('gqt.bulk.CHECKPOINT_INTERVAL', 3600)
+    def test_checkpoint_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint')
+            checkpoint = Checkpoint(path)
+
+            for row_number in [2, 1, 5, 3]:
+                checkpoint.mark_done(row_number)
+
+            # Not saved, as if killed. A cut short line is ignored.
+            with open(path, 'ab') as fout:
+                fout.write(b'4')
+
+            with open(path, 'rb') as fin:
+                self.assertEqual(fin.read(),
+                                 b'{"completed":0,"done":[2]}\n1\n5\n3\n4')
+
+            checkpoint = Checkpoint(path)
+
+            self.assertEqual(checkpoint.completed, 3)
+            self.assertEqual(checkpoint.done, {5})
+
+    def test_adaptive_concurrency(self):
+        concurrency = AdaptiveConcurrency(4)
+
+        for _ in range(20):
+            concurrency.release(concurrency.acquire(), False)
+
+        self.assertEqual(concurrency.limit, 4)
+
+        concurrency.release(concurrency.acquire(), True)
+
+        self.assertEqual(concurrency.limit, 2)
+
+    @patch('gqt.retry.BACKOFF', 0)
+    def test_run_bulk(self):
+        attempts = []
+
+        def execute(variables):
+            attempts.append(variables['n'])
+
+            if variables['n'] == 3 and attempts.count(3) == 1:
+                raise OverloadedError('HTTP status 429.')
+
+            if variables['n'] == 4:
+                raise OverloadedError('HTTP status 503.')
+
+            return {'data': variables['n']}
+
+        results = {}
+
+        def emit(row_number, result, error):
+            results[row_number] = (result, str(error) if error else None)
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = Checkpoint(os.path.join(directory, 'checkpoint'))
+            checkpoint.mark_done(1)
+            run_bulk(execute,
+                     ((n, {'n': n}) for n in range(1, 6)),
+                     2,
+                     checkpoint,
+                     emit,
+                     RetryPolicy(retries=2),
+                     True)
+
+            self.assertEqual(results,
+                             {
+                                 2: ({'data': 2}, None),
+                                 3: ({'data': 3}, None),
+                                 4: (None, 'HTTP status 503.'),
+                                 5: ({'data': 5}, None)
+                             })
+            self.assertEqual(attempts.count(3), 2)
+            self.assertEqual(attempts.count(4), 3)
+            self.assertEqual(Checkpoint(checkpoint.path).completed, 3)
+            self.assertEqual(Checkpoint(checkpoint.path).done, {5})
+
+    def test_run_bulk_not_retryable(self):
+        attempts = []
+
+        def execute(variables):
+            attempts.append(variables['n'])
+
+            raise OverloadedError('HTTP status 503.')
+
+        results = {}
+
+        def emit(row_number, result, error):
+            results[row_number] = str(error)
+
+        with tempfile.TemporaryDirectory() as directory:
+            run_bulk(execute,
+                     [(1, {'n': 1})],
+                     1,
+                     Checkpoint(os.path.join(directory, 'checkpoint')),
+                     emit,
+                     RetryPolicy(retries=2),
+                     False)
+
+        self.assertEqual(results, {1: 'HTTP status 503.'})
+        self.assertEqual(attempts, [1])
@@ -0,0 +1,102 @@
+import json
+import os
+import pathlib
+import tempfile
+import time
+import unittest
+
+from gqt.cache import ResponseCache
+from gqt.cache import create_key
+from gqt.cache import execute_cached
+from gqt.cache import parse_cache_control
+
+
+class Response:
+
+    def __init__(self, status_code, data, headers):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode('utf-8')
+        self.headers = headers
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(pathlib.Path(self.directory.name))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_create_key(self):
+        self.assertEqual(create_key('http://x/', '{a b}', {'c': 1}, None),
+                         create_key('http://x/', 'query {\n  a\n  b\n}', {'c': 1}, {}))
+        self.assertNotEqual(create_key('http://x/', '{a}', {'c': 1}, None),
+                            create_key('http://x/', '{a}', {'c': 2}, None))
+        self.assertNotEqual(create_key('http://x/', '{a}', None, {'d': 'e'}),
+                            create_key('http://x/', '{a}', None, None))
+
+    def test_parse_cache_control(self):
+        self.assertEqual(parse_cache_control(None), (True, None))
+        self.assertEqual(parse_cache_control('public, max-age=30'), (True, 30))
+        self.assertEqual(parse_cache_control('no-cache'), (True, 0))
+        self.assertEqual(parse_cache_control('private, no-store'), (False, None))
+
+    def test_execute_cached(self):
+        requests = []
+
+        def fetch(headers):
+            requests.append(headers)
+
+            if headers.get('If-None-Match') == '"1"':
+                return Response(304, None, {'ETag': '"1"'})
+
+            return Response(200, {'data': len(requests)}, {'ETag': '"1"'})
+
+        self.assertEqual(execute_cached(fetch, self.cache, 'k', 60, True),
+                         {'data': 1})
+        self.assertEqual(execute_cached(fetch, self.cache, 'k', 60, True),
+                         {'data': 1})
+        self.assertEqual(requests, [{}])
+
+        # Not read, but stored.
+        self.assertEqual(execute_cached(fetch, self.cache, 'k', 0, False),
+                         {'data': 2})
+
+        # Stale, revalidated with the ETag.
+        self.assertEqual(execute_cached(fetch, self.cache, 'k', 60, True),
+                         {'data': 2})
+        self.assertEqual(requests, [{}, {}, {'If-None-Match': '"1"'}])
+        self.assertGreater(self.cache.get('k')['expires'], time.time() + 30)
+
+    def test_no_store_and_errors(self):
+        def fetch(headers):
+            return Response(200, {'data': 1}, {'Cache-Control': 'no-store'})
+
+        execute_cached(fetch, self.cache, 'k', 60, True)
+
+        def fetch(headers):
+            return Response(200, {'errors': [{'message': 'Boom.'}]}, {})
+
+        execute_cached(fetch, self.cache, 'k', 60, True)
+
+        self.assertIsNone(self.cache.get('k'))
+
+    def test_evict(self):
+        cache = ResponseCache(self.cache.path, 250)
+
+        for index, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, {'data': 50 * 'x'}, None, 0)
+            os.utime(cache.entry_path(key), (index, index))
+
+        cache.put('d', {'data': 50 * 'x'}, None, 0)
+
+        self.assertEqual(sorted(path.stem for path in cache.path.glob('*.json')),
+                         ['c', 'd'])
+
+    def test_put_writes_utf_8(self):
+        self.cache.put('k', {'data': 'ä€'}, None, 0)
+
+        self.assertIn('ä€'.encode('utf-8'),
+                      self.cache.entry_path('k').read_bytes())
+        self.assertEqual(self.cache.get('k')['response'], {'data': 'ä€'})
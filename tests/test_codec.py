@@ -0,0 +1,33 @@
+import json
+import math
+import unittest
+
+from gqt.codec import dumps
+from gqt.codec import dumps_pretty
+from gqt.codec import loads
+
+
+class CodecTest(unittest.TestCase):
+
+    def test_dumps_pretty(self):
+        datas = [
+            {},
+            {'a': {'b': [1, 'ü', None, True, {}, []], 'c': {'d': {'e': 'f'}}}},
+            [[[]]],
+            'string'
+        ]
+
+        for data in datas:
+            self.assertEqual(dumps_pretty(data),
+                             json.dumps(data, ensure_ascii=False, indent=4))
+
+    def test_big_integers(self):
+        self.assertEqual(dumps([123456789012345678901234567890]),
+                         '[123456789012345678901234567890]')
+        self.assertEqual(dumps_pretty([123456789012345678901234567890]),
+                         '[\n    123456789012345678901234567890\n]')
+
+    def test_loads_bytes_and_str(self):
+        self.assertEqual(loads(b'{"a": "\\u00fc"}'), {'a': 'ü'})
+        self.assertEqual(loads('{"a": 1}'), {'a': 1})
+        self.assertTrue(math.isnan(loads('[NaN]')[0]))
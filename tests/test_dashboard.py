@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from gqt.dashboard import QueryState
+from gqt.dashboard import iter_scalars
+from gqt.dashboard import run_fetch
+from gqt.dashboard import sparkline
+
+
+class DashboardTest(unittest.TestCase):
+
+    def test_sparkline(self):
+        self.assertEqual(sparkline([]), '')
+        self.assertEqual(sparkline([3, 3]), '▁▁')
+        self.assertEqual(sparkline([0, 7, 14]), '▁▄█')
+
+    def test_iter_scalars(self):
+        self.assertEqual(list(iter_scalars({'a': {'b': 1, 'c': [True, None]}})),
+                         [('a.b', 1), ('a.c[0]', True), ('a.c[1]', None)])
+
+    def test_query_state(self):
+        responses = iter([
+            {'data': {'a': 1, 'b': 'x'}},
+            {'data': {'a': 3, 'b': 'y'}},
+            {'errors': [{'message': 'Boom.'}], 'data': None}
+        ])
+        state = QueryState('q', lambda: next(responses))
+        lock = threading.Lock()
+
+        self.assertEqual(state.status(), 'waiting')
+
+        run_fetch(state, lock)
+        run_fetch(state, lock)
+        rows = state.rows()
+
+        self.assertEqual(state.status(), 'ok')
+        self.assertEqual(rows[0][4], 'ok')
+        self.assertEqual(rows[1], ['  a', '3', '', '▁█', ''])
+        self.assertEqual(rows[2], ['  b', '"y"', '', '', ''])
+
+        run_fetch(state, lock)
+
+        self.assertEqual(state.status(), 'error')
+        self.assertEqual(state.rows()[0][4], 'error: Boom.')
+        self.assertEqual(state.values, {'a': 3, 'b': 'y'})
+
+    def test_fetch_error(self):
+        def fetch():
+            raise Exception('Connection refused.')
+
+        state = QueryState('q', fetch)
+        run_fetch(state, threading.Lock())
+
+        self.assertEqual(state.status(), 'error')
+        self.assertEqual(state.error, 'Connection refused.')
+        self.assertFalse(state.in_flight)
@@ -0,0 +1,186 @@
+import gzip
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from gqt.document import is_query_operation
+from gqt.endpoint import BatchingTransport
+from gqt.endpoint import Transport
+from gqt.endpoint import create_body
+from gqt.endpoint import create_get_url
+from gqt.endpoint import format_sizes
+from gqt.endpoint import iter_body
+from gqt.endpoint import post
+from gqt.retry import DeadlineExceeded
+from gqt.retry import RetryPolicy
+
+
+class Response:
+
+    def __init__(self, status_code, data, method='POST'):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode('utf-8')
+        self.method = method
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+
+    def __init__(self, accept_arrays):
+        self.accept_arrays = accept_arrays
+        self.bodies = []
+        self.lock = threading.Lock()
+
+    def post(self, endpoint, json, headers, verify, stream=False):
+        with self.lock:
+            self.bodies.append(json)
+
+        if isinstance(json, list):
+            if not self.accept_arrays:
+                return Response(400, {'errors': [{'message': 'Bad request.'}]})
+
+            return Response(200, [{'data': query['query']} for query in json])
+
+        return Response(200, {'data': json['query']})
+
+    def get(self, url, headers, verify, stream=False):
+        return Response(200, {'data': url}, 'GET')
+
+
+def execute_all(transport, number_of_queries):
+    with ThreadPoolExecutor(max_workers=number_of_queries) as executor:
+        return list(executor.map(lambda index: transport.execute({'query': index}),
+                                 range(number_of_queries)))
+
+
+class EndpointTest(unittest.TestCase):
+
+    def test_batching_transport(self):
+        session = Session(True)
+        transport = BatchingTransport('http://x/', None, True, session, 4, 0.5)
+
+        try:
+            responses = execute_all(transport, 8)
+        finally:
+            transport.close()
+
+        self.assertEqual(responses, [{'data': index} for index in range(8)])
+        self.assertEqual(len(session.bodies), 2)
+        self.assertEqual(sorted(len(body) for body in session.bodies), [4, 4])
+
+    def test_batching_transport_fallback(self):
+        session = Session(False)
+        transport = BatchingTransport('http://x/', None, True, session, 4, 0.5)
+
+        try:
+            responses = execute_all(transport, 4)
+            self.assertFalse(transport.batching)
+            responses += execute_all(transport, 2)
+        finally:
+            transport.close()
+
+        self.assertEqual(responses,
+                         [{'data': index} for index in [0, 1, 2, 3, 0, 1]])
+        self.assertEqual([isinstance(body, list) for body in session.bodies],
+                         [True] + 6 * [False])
+
+    def test_create_get_url(self):
+        self.assertEqual(
+            create_get_url('http://x/', {'query': '{a}', 'variables': {'b': 'é &'}}),
+            'http://x/?query=%7Ba%7D&variables=%7B%22b%22%3A%22%C3%A9+%26%22%7D')
+        self.assertEqual(create_get_url('http://x/?c=1', {'query': '{a}'}),
+                         'http://x/?c=1&query=%7Ba%7D')
+
+    def test_post_get(self):
+        session = Session(True)
+
+        response = post('http://x/',
+                        {'query': '{a}'},
+                        None,
+                        True,
+                        session=session,
+                        get=True)
+
+        self.assertEqual(response.method, 'GET')
+        self.assertEqual(
+            post('http://x/',
+                 {'query': '{a}', 'variables': {'b': 3000 * 'c'}},
+                 None,
+                 True,
+                 session=session,
+                 get=True).method,
+            'POST')
+
+    def test_is_query_operation(self):
+        self.assertTrue(is_query_operation('{a}'))
+        self.assertTrue(is_query_operation('query Q {a}'))
+        self.assertFalse(is_query_operation('mutation M {a}'))
+
+    def test_create_body(self):
+        query = {'query': '{a}', 'variables': {'b': 2000 * 'c'}}
+
+        self.assertEqual(create_body(query, {'d': 'e'}, False),
+                         {'json': query, 'headers': {'d': 'e'}})
+        self.assertEqual(create_body({'query': '{a}'}, None, True),
+                         {'json': {'query': '{a}'}, 'headers': None})
+
+        kwargs = create_body(query, {'d': 'e'}, True)
+
+        self.assertEqual(json.loads(gzip.decompress(kwargs['data'])), query)
+        self.assertEqual(kwargs['headers'],
+                         {
+                             'Content-Type': 'application/json',
+                             'd': 'e',
+                             'Content-Encoding': 'gzip'
+                         })
+
+    def test_format_sizes(self):
+        class Request:
+            body = gzip.compress(2000 * b'a')
+            headers = {'Content-Encoding': 'gzip'}
+
+        class Raw:
+
+            def tell(self):
+                return 40
+
+        response = Response(200, {'data': 1000 * 'b'})
+        response.request = Request()
+        response.raw = Raw()
+        response.headers = {'Content-Encoding': 'br'}
+
+        self.assertEqual(
+            format_sizes(response),
+            f'sent {len(Request.body)} B gzip (2000 B decoded), '
+            'received 40 B br (1012 B decoded)')
+
+    def test_iter_body_deadline(self):
+        class Raw:
+
+            def read1(self, amt, decode_content):
+                # Trickles one byte at a time.
+                time.sleep(0.01)
+
+                return b'x'
+
+        class Response:
+            raw = Raw()
+
+        chunks = []
+
+        with self.assertRaises(DeadlineExceeded):
+            for chunk in iter_body(Response(), RetryPolicy(deadline=0.1)):
+                chunks.append(chunk)
+
+        self.assertGreater(len(chunks), 1)
+
+    def test_transport_get(self):
+        transport = Transport('http://x/', None, True, Session(True), get=True)
+
+        self.assertTrue(transport.execute({'query': '{a}'})['data'].startswith('http'))
+        self.assertEqual(transport.execute({'query': 'mutation {a}'}),
+                         {'data': 'mutation {a}'})
@@ -0,0 +1,199 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+from graphql import build_schema
+from graphql import graphql_sync
+from graphql.language import parse
+from graphql.language import print_ast
+
+from gqt.entities import EntityStore
+from gqt.entities import add_key_fields
+from gqt.entities import execute_entity_cached
+from gqt.entities import field_key
+
+SCHEMA = build_schema('''
+type Query {
+  issues(first: Int): [Issue!]!
+  issue(id: ID!): Issue
+}
+
+type Issue {
+  id: ID!
+  title: String
+  state: String
+  author: Author
+}
+
+type Author {
+  login: String
+}
+''')
+
+ISSUES = {
+    '1': {'id': '1', 'title': 'a', 'state': 'OPEN', 'author': {'login': 'x'}},
+    '2': {'id': '2', 'title': 'b', 'state': 'CLOSED', 'author': {'login': 'y'}}
+}
+
+
+class Root:
+
+    def issues(self, info, first=10):
+        return list(ISSUES.values())[:first]
+
+    def issue(self, info, id):
+        return ISSUES.get(id)
+
+
+class Response:
+
+    def __init__(self, data):
+        self.content = json.dumps(data).encode('utf-8')
+        self.headers = {}
+
+
+class EntitiesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queries = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def store(self):
+        return EntityStore(SCHEMA, pathlib.Path(self.directory.name) / 'store.json')
+
+    def fetch(self, query, variables):
+        self.queries.append(print_ast(parse(query)))
+        result = graphql_sync(SCHEMA, query, Root(), variable_values=variables)
+        response = {'data': result.data}
+
+        if result.errors:
+            response['errors'] = [{'message': error.message} for error in result.errors]
+
+        return Response(response)
+
+    def execute(self, query, variables=None):
+        return execute_entity_cached(self.fetch,
+                                     self.store(),
+                                     query,
+                                     variables or {},
+                                     60)
+
+    def test_field_key(self):
+        document = parse('{issue(id: $id) {title}}')
+        field = document.definitions[0].selection_set.selections[0]
+
+        self.assertEqual(field_key(field, {'id': '1'}), 'issue({"id":"1"})')
+
+    def test_field_key_unset_variable(self):
+        document = parse('query Q($first: Int) {issues(first: $first) {title}}')
+        field = document.definitions[0].selection_set.selections[0]
+
+        self.assertEqual(field_key(field, {}), 'issues')
+        self.assertEqual(field_key(field, {'first': 1}), 'issues({"first":1})')
+
+    def test_unset_optional_variable(self):
+        query = 'query Q($first: Int) {issues(first: $first) {title}}'
+        data = {'data': {'issues': [{'title': 'a'}, {'title': 'b'}]}}
+
+        self.assertEqual(self.execute(query), data)
+        self.assertEqual(self.execute('{issues {title}}'), data)
+        self.assertEqual(len(self.queries), 1)
+
+    def test_add_key_fields(self):
+        document = add_key_fields(parse('{issues {title author {login}}}'), SCHEMA)
+
+        self.assertEqual(
+            print_ast(document),
+            '{\n'
+            '  issues {\n'
+            '    __typename\n'
+            '    id\n'
+            '    title\n'
+            '    author {\n'
+            '      __typename\n'
+            '      login\n'
+            '    }\n'
+            '  }\n'
+            '}')
+
+    def test_repeated_query_is_served_from_cache(self):
+        query = '{issues {title}}'
+        data = {'data': {'issues': [{'title': 'a'}, {'title': 'b'}]}}
+
+        self.assertEqual(self.execute(query), data)
+        self.assertEqual(self.execute(query), data)
+        self.assertEqual(len(self.queries), 1)
+
+    def test_only_missing_fields_are_fetched(self):
+        self.execute('{issues {title}}')
+        response = self.execute('{issues {title state}}')
+
+        self.assertEqual(response,
+                         {
+                             'data': {
+                                 'issues': [
+                                     {'title': 'a', 'state': 'OPEN'},
+                                     {'title': 'b', 'state': 'CLOSED'}
+                                 ]
+                             }
+                         })
+        self.assertEqual(self.queries[1],
+                         '{\n'
+                         '  issues {\n'
+                         '    __typename\n'
+                         '    id\n'
+                         '    state\n'
+                         '  }\n'
+                         '}')
+
+    def test_arguments_and_unused_variables(self):
+        query = 'query Q($id: ID!) {issues {title} issue(id: $id) {title}}'
+
+        self.execute('{issues {title}}')
+        response = self.execute(query, {'id': '2'})
+
+        self.assertEqual(response['data']['issue'], {'title': 'b'})
+        self.assertEqual(self.queries[1],
+                         'query Q($id: ID!) {\n'
+                         '  issue(id: $id) {\n'
+                         '    __typename\n'
+                         '    id\n'
+                         '    title\n'
+                         '  }\n'
+                         '}')
+        self.execute(query, {'id': '2'})
+        self.assertEqual(len(self.queries), 2)
+        self.execute(query, {'id': '1'})
+        self.assertEqual(len(self.queries), 3)
+
+    def test_new_objects_are_fetched_in_full(self):
+        self.execute('{issues {title}}')
+        ISSUES['3'] = {'id': '3', 'title': 'c', 'state': 'OPEN'}
+
+        try:
+            response = self.execute('{issues {title state}}')
+        finally:
+            del ISSUES['3']
+
+        self.assertEqual(response['data']['issues'][2], {'title': 'c', 'state': 'OPEN'})
+        self.assertEqual(len(self.queries), 3)
+        self.assertEqual(self.queries[2],
+                         '{\n'
+                         '  issues {\n'
+                         '    __typename\n'
+                         '    id\n'
+                         '    title\n'
+                         '    state\n'
+                         '  }\n'
+                         '}')
+
+    def test_errors_are_not_cached(self):
+        response = self.execute('{issue(id: "1") {title} issues(first: "x") {id}}')
+
+        self.assertIn('errors', response)
+        self.execute('{issue(id: "1") {title}}')
+        self.assertEqual(len(self.queries), 2)
@@ -0,0 +1,59 @@
+import base64
+import json
+import shlex
+import unittest
+
+from gqt.export import export
+from gqt.export import lua_quote
+
+QUERY = {
+    'query': "query Query {a(b: \"it's\") {c}}",
+    'variables': {
+        'd': 'é\n'
+    }
+}
+
+
+class ExportTest(unittest.TestCase):
+
+    def test_curl(self):
+        command = export('curl', 'http://x/', QUERY, {'X-Token': "it's"})
+        arguments = shlex.split(command.replace('\\\n', ''))
+
+        self.assertEqual(arguments,
+                         [
+                             'curl', '-X', 'POST',
+                             '-H', 'content-type: application/json',
+                             '-H', "X-Token: it's",
+                             'http://x/',
+                             '-d', json.dumps(QUERY)
+                         ])
+
+    def test_k6(self):
+        script = export('k6', 'http://x/', QUERY, None)
+
+        self.assertIn('const ENDPOINT = "http://x/";', script)
+        body = script.split('JSON.stringify(')[1].split(');\n')[0]
+        self.assertEqual(json.loads(body), QUERY)
+
+    def test_wrk(self):
+        script = export('wrk', 'http://x/', QUERY, {'X-Token': 'y'})
+
+        self.assertIn('wrk.method = "POST"\n', script)
+        self.assertIn(f'wrk.body = {lua_quote(json.dumps(QUERY))}\n', script)
+        self.assertTrue(script.endswith('wrk.headers["X-Token"] = "y"'))
+
+    def test_lua_quote(self):
+        self.assertEqual(lua_quote('a"\\\né'), '"a\\"\\\\\\010\\195\\169"')
+
+    def test_vegeta(self):
+        target = json.loads(export('vegeta', 'http://x/', QUERY, {'X-Token': 'y'}))
+
+        self.assertEqual(target['method'], 'POST')
+        self.assertEqual(target['url'], 'http://x/')
+        self.assertEqual(json.loads(base64.b64decode(target['body'])), QUERY)
+        self.assertEqual(target['header'],
+                         {
+                             'content-type': ['application/json'],
+                             'X-Token': ['y']
+                         })
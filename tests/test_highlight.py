@@ -0,0 +1,64 @@
+import io
+import unittest
+
+from gqt.highlight import COLORS
+from gqt.highlight import HighlightingWriter
+from gqt.highlight import RESET
+from gqt.highlight import highlight
+from gqt.highlight import highlight_line
+
+
+def color(token, text):
+    return COLORS[token] + text + RESET
+
+
+class HighlightTest(unittest.TestCase):
+
+    def test_json(self):
+        self.assertEqual(
+            highlight_line('{"a": "b: c", "d": [-1.5e3, true, null]}', 'json'),
+            '{' + color('key', '"a"') + ': ' + color('string', '"b: c"') + ', '
+            + color('key', '"d"') + ': [' + color('number', '-1.5e3') + ', '
+            + color('literal', 'true') + ', ' + color('literal', 'null') + ']}')
+        self.assertEqual(highlight_line('"a\\"b"', 'json'),
+                         color('string', '"a\\"b"'))
+
+    def test_yaml(self):
+        self.assertEqual(highlight_line('a: b # c', 'yaml'),
+                         color('key', 'a') + ': ' + color('string', 'b') + ' '
+                         + color('comment', '# c'))
+        self.assertEqual(highlight_line('- x: -3', 'yaml'),
+                         '- ' + color('key', 'x') + ': ' + color('number', '-3'))
+        self.assertEqual(highlight_line('  - ~', 'yaml'),
+                         '  - ' + color('literal', '~'))
+        self.assertEqual(highlight_line("'it''s': false", 'yaml'),
+                         color('key', "'it''s'") + ': ' + color('literal', 'false'))
+        self.assertEqual(highlight_line('a: b#c', 'yaml'),
+                         color('key', 'a') + ': ' + color('string', 'b#c'))
+
+    def test_yaml_quoted_scalar_with_hash(self):
+        self.assertEqual(highlight_line("key: 'a # b'", 'yaml'),
+                         color('key', 'key') + ': ' + color('string', "'a # b'"))
+        self.assertEqual(highlight_line('key: "a # b" # c', 'yaml'),
+                         color('key', 'key') + ': ' + color('string', '"a # b"') + ' '
+                         + color('comment', '# c'))
+
+    def test_yaml_nested_sequence(self):
+        self.assertEqual(highlight_line('- - 3', 'yaml'),
+                         '- - ' + color('number', '3'))
+        self.assertEqual(highlight_line('- - a', 'yaml'),
+                         '- - ' + color('string', 'a'))
+        self.assertEqual(highlight_line('- - a: 1', 'yaml'),
+                         '- - ' + color('key', 'a') + ': ' + color('number', '1'))
+
+    def test_writer_chunk_boundaries(self):
+        text = '{\n    "a": "x y",\n    "b": 12\n}'
+        stream = io.StringIO()
+        writer = HighlightingWriter(stream, 'json')
+
+        for chunk in ['{\n    "a', '": "x', ' y",\n', '    "b": 1', '2\n}']:
+            writer.write(chunk)
+
+        self.assertEqual(stream.getvalue(), highlight(text[:-1], 'json'))
+        writer.flush()
+        self.assertEqual(stream.getvalue(), highlight(text, 'json'))
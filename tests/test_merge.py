@@ -0,0 +1,56 @@
+import unittest
+
+from gqt.merge import merge_queries
+
+
+class MergeTest(unittest.TestCase):
+
+    def test_merge_queries(self):
+        merged_query = merge_queries(
+            [
+                ('a', 'query Query($x: Int, $y: String) {items(offset: $x) {id} b: c}'),
+                ('b', 'query Query($x: String, $y: String) {issues(after: $x, y: $y)}')
+            ],
+            {'x': 1, 'y': 'z'})
+
+        self.assertEqual(merged_query.query,
+                         'query Merged($x: Int, $y: String, $q2_x: String) {\n'
+                         '  q1_items: items(offset: $x) {\n'
+                         '    id\n'
+                         '  }\n'
+                         '  q1_b: c\n'
+                         '  q2_issues: issues(after: $q2_x, y: $y)\n'
+                         '}')
+        self.assertEqual(merged_query.variables, {'x': 1, 'y': 'z', 'q2_x': 1})
+
+    def test_split(self):
+        merged_query = merge_queries([('a', 'query Query {b c}'), ('d', '{b}')], {})
+        responses = merged_query.split({
+            'data': {'q1_b': 1, 'q1_c': None, 'q2_b': 2},
+            'errors': [
+                {'message': 'c failed', 'path': ['q1_c']},
+                {'message': 'All failed'}
+            ]
+        })
+
+        self.assertEqual(responses,
+                         {
+                             'a': {
+                                 'data': {'b': 1, 'c': None},
+                                 'errors': [
+                                     {'message': 'c failed', 'path': ['c']},
+                                     {'message': 'All failed'}
+                                 ]
+                             },
+                             'd': {
+                                 'data': {'b': 2},
+                                 'errors': [{'message': 'All failed'}]
+                             }
+                         })
+
+    def test_query_and_mutation(self):
+        with self.assertRaises(Exception) as cm:
+            merge_queries([('a', 'query Query {b}'), ('c', 'mutation M {d}')], {})
+
+        self.assertEqual(str(cm.exception),
+                         'Queries and mutations cannot be merged.')
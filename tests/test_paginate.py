@@ -0,0 +1,101 @@
+import unittest
+
+from graphql.language import parse
+from graphql.language import print_ast
+
+from gqt.paginate import create_pagination
+from gqt.paginate import paginate
+
+
+def normalize(query):
+    return print_ast(parse(query))
+
+
+class PaginateTest(unittest.TestCase):
+
+    def test_create_pagination(self):
+        pagination = create_pagination(
+            'query Query {repository {issues(first: 2) {nodes {title}}}}',
+            'repository.issues',
+            {})
+        self.assertEqual(
+            pagination.query,
+            normalize('query Query($gqtAfter: String) {'
+                      '  repository {'
+                      '    issues(first: 2, after: $gqtAfter) {'
+                      '      nodes {title}'
+                      '      pageInfo {hasNextPage endCursor}'
+                      '    }'
+                      '  }'
+                      '}'))
+        self.assertEqual(pagination.items_key, 'nodes')
+        self.assertEqual(pagination.cursor_variable, 'gqtAfter')
+        self.assertIsNone(pagination.cursor)
+
+    def test_create_pagination_existing_after(self):
+        pagination = create_pagination(
+            'query Query($a: String) {'
+            '  issues(after: $a) {edges {node {title}} pageInfo {endCursor}}'
+            '}',
+            'issues',
+            {'a': 'x'})
+        self.assertEqual(
+            pagination.query,
+            normalize('query Query($a: String) {'
+                      '  issues(after: $a) {'
+                      '    edges {node {title}}'
+                      '    pageInfo {endCursor hasNextPage}'
+                      '  }'
+                      '}'))
+        self.assertEqual(pagination.items_key, 'edges')
+        self.assertEqual(pagination.cursor_variable, 'a')
+        self.assertEqual(pagination.cursor, 'x')
+
+        pagination = create_pagination('query Query {issues(after: "y") {nodes {a}}}',
+                                       'issues',
+                                       {})
+        self.assertEqual(pagination.cursor, 'y')
+
+    def test_create_pagination_errors(self):
+        with self.assertRaisesRegex(Exception, 'Only queries can be paginated.'):
+            create_pagination('mutation Mutation {issues {nodes {a}}}', 'issues', {})
+
+        with self.assertRaisesRegex(Exception,
+                                    "No connection 'foo' found in the query."):
+            create_pagination('query Query {issues {nodes {a}}}', 'foo', {})
+
+        with self.assertRaisesRegex(Exception,
+                                    "Connection 'issues' has neither edges nor "
+                                    "nodes selected."):
+            create_pagination('query Query {issues {totalCount}}', 'issues', {})
+
+    def test_paginate(self):
+        pagination = create_pagination('query Query {issues {nodes {a}}}',
+                                       'issues',
+                                       {})
+        cursors = []
+
+        def fetch(variables):
+            cursor = variables['gqtAfter']
+            cursors.append(cursor)
+            start = int(cursor or 0)
+
+            return {
+                'issues': {
+                    'nodes': list(range(start, start + 3)),
+                    'pageInfo': {
+                        'hasNextPage': start < 6,
+                        'endCursor': str(start + 3)
+                    }
+                }
+            }
+
+        for prefetch in [False, True]:
+            cursors.clear()
+            self.assertEqual(list(paginate(fetch, pagination, {}, None, prefetch)),
+                             list(range(9)))
+            self.assertEqual(cursors, [None, '3', '6'])
+            cursors.clear()
+            self.assertEqual(list(paginate(fetch, pagination, {}, 4, prefetch)),
+                             list(range(4)))
+            self.assertEqual(cursors, [None, '3'])
@@ -0,0 +1,96 @@
+import hashlib
+import unittest
+
+from gqt.persisted import create_manifest
+from gqt.persisted import execute_persisted_query
+
+QUERY = '{a}'
+HASH = hashlib.sha256(b'{a}').hexdigest()
+
+
+class Server:
+
+    def __init__(self, supported=True, ignored=False, failing=False):
+        self.supported = supported
+        self.ignored = ignored
+        self.failing = failing
+        self.queries = {}
+        self.requests = []
+
+    def fetch(self, request):
+        self.requests.append(sorted(request))
+
+        if self.ignored and 'query' not in request:
+            return {'errors': [{'message': 'Must provide query string.'}]}
+
+        persisted_query = request.get('extensions', {}).get('persistedQuery')
+
+        if persisted_query is not None and not self.ignored:
+            if not self.supported:
+                return {'errors': [{'message': 'PersistedQueryNotSupported'}]}
+
+            if 'query' in request:
+                self.queries[persisted_query['sha256Hash']] = request['query']
+            elif persisted_query['sha256Hash'] not in self.queries:
+                return {
+                    'errors': [
+                        {
+                            'message': 'Not found.',
+                            'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'}
+                        }
+                    ]
+                }
+
+        if self.failing:
+            return {'errors': [{'message': 'Name taken.', 'path': ['create']}]}
+
+        return {'data': {'a': 1}}
+
+
+class PersistedTest(unittest.TestCase):
+
+    def test_unknown_hash(self):
+        server = Server()
+
+        self.assertEqual(execute_persisted_query(server.fetch, QUERY, {}),
+                         ({'data': {'a': 1}}, False))
+        self.assertEqual(server.requests,
+                         [['extensions'], ['extensions', 'query']])
+        self.assertEqual(server.queries, {HASH: QUERY})
+
+    def test_accepted_hash(self):
+        server = Server()
+        server.queries[HASH] = QUERY
+
+        self.assertEqual(execute_persisted_query(server.fetch, QUERY, {'b': 1}),
+                         ({'data': {'a': 1}}, True))
+        self.assertEqual(server.requests, [['extensions', 'variables']])
+
+    def test_extension_ignored(self):
+        server = Server(ignored=True)
+
+        self.assertEqual(execute_persisted_query(server.fetch, QUERY, {}),
+                         ({'data': {'a': 1}}, False))
+        self.assertEqual(server.requests,
+                         [['extensions'], ['extensions', 'query']])
+
+    def test_not_supported(self):
+        server = Server(False)
+
+        self.assertEqual(execute_persisted_query(server.fetch, QUERY, {}),
+                         ({'data': {'a': 1}}, False))
+        self.assertEqual(server.requests, [['extensions'], ['query']])
+
+    def test_execution_error_is_not_resent(self):
+        query = 'mutation {create(name: "a") {id}}'
+        server = Server(failing=True)
+        server.queries[hashlib.sha256(query.encode('utf-8')).hexdigest()] = query
+
+        response, accepted = execute_persisted_query(server.fetch, query, {})
+
+        self.assertEqual(response['errors'][0]['message'], 'Name taken.')
+        self.assertTrue(accepted)
+        self.assertEqual(server.requests, [['extensions']])
+
+    def test_create_manifest(self):
+        self.assertEqual(create_manifest([QUERY, QUERY]), {HASH: QUERY})
@@ -0,0 +1,119 @@
+import time
+import unittest
+from email.utils import formatdate
+
+import requests
+
+from gqt.retry import DeadlineExceeded
+from gqt.retry import MAX_RETRY_AFTER
+from gqt.retry import RetryPolicy
+from gqt.retry import is_query_request
+from gqt.retry import parse_retry_after
+from gqt.retry import send_with_retries
+
+
+class Response:
+
+    def __init__(self, status_code, retry_after='0'):
+        self.status_code = status_code
+        self.headers = {'Retry-After': retry_after}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_send(results):
+    timeouts = []
+
+    def send(timeout):
+        timeouts.append(timeout)
+        result = results.pop(0)
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+    return send, timeouts
+
+
+class RetryTest(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after(None), None)
+        self.assertEqual(parse_retry_after('3'), 3)
+        self.assertEqual(parse_retry_after('-1'), 0)
+        self.assertEqual(parse_retry_after('foo'), None)
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 60)),
+                               60,
+                               delta=2)
+
+    def test_is_query_request(self):
+        self.assertTrue(is_query_request({'query': '{a}'}))
+        self.assertTrue(is_query_request([{'query': '{a}'}, {'query': '{b}'}]))
+        self.assertFalse(is_query_request({'query': 'mutation M {a}'}))
+        self.assertFalse(is_query_request([{'query': '{a}'},
+                                           {'query': 'mutation {b}'}]))
+        self.assertFalse(is_query_request({'extensions': {}}))
+
+    def test_retry_query(self):
+        send, timeouts = make_send([
+            requests.exceptions.ConnectionError(),
+            Response(502),
+            Response(200)
+        ])
+        policy = RetryPolicy(1, 2, 2)
+
+        self.assertEqual(send_with_retries(send, policy, {'query': '{a}'}).status_code,
+                         200)
+        self.assertEqual(timeouts, 3 * [(1, 2)])
+
+    def test_retries_exhausted(self):
+        send, _ = make_send([Response(503), Response(503)])
+
+        response = send_with_retries(send, RetryPolicy(retries=1), {'query': '{a}'})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.closed)
+
+        send, _ = make_send([Response(503), requests.exceptions.ReadTimeout()])
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            send_with_retries(send, RetryPolicy(retries=1), {'query': '{a}'})
+
+    def test_mutations_are_retried_only_if_idempotent(self):
+        query = {'query': 'mutation M {a}'}
+        send, _ = make_send([Response(502), Response(200)])
+
+        self.assertEqual(send_with_retries(send, RetryPolicy(), query).status_code,
+                         502)
+
+        send, _ = make_send([Response(502), Response(200)])
+        policy = RetryPolicy(idempotent=True)
+
+        self.assertEqual(send_with_retries(send, policy, query).status_code, 200)
+
+    def test_long_retry_after(self):
+        send, _ = make_send([Response(503, '86400'), Response(200)])
+        response = send_with_retries(send, RetryPolicy(), {'query': '{a}'})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(RetryPolicy().delay(0, MAX_RETRY_AFTER), MAX_RETRY_AFTER)
+        self.assertIsNone(RetryPolicy().delay(0, MAX_RETRY_AFTER + 1))
+
+    def test_deadline(self):
+        policy = RetryPolicy(10, None, 2, 5)
+        send, timeouts = make_send([Response(503, '60')])
+
+        self.assertEqual(send_with_retries(send, policy, {'query': '{a}'}).status_code,
+                         503)
+        connect_timeout, read_timeout = timeouts[0]
+        self.assertLessEqual(connect_timeout, 5)
+        self.assertLessEqual(read_timeout, 5)
+
+        policy = RetryPolicy(deadline=0.01)
+        time.sleep(0.02)
+
+        with self.assertRaises(DeadlineExceeded):
+            policy.timeout()
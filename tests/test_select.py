@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from gqt.select import parse_select
+from gqt.select import select_events
+from gqt.select import select_values
+from gqt.stream import iter_events
+
+DATA = {
+    'repository': {
+        'issues': {
+            'nodes': [
+                {'title': 'A', 'state': 'OPEN', 'comments': {'count': 3}},
+                {'title': 'B', 'state': 'CLOSED', 'comments': {'count': 0}},
+                {'title': 'C', 'state': 'OPEN', 'comments': {'count': 10}},
+                {'title': 'D', 'state': None, 'comments': None}
+            ]
+        },
+        'name': 'gqt'
+    }
+}
+
+
+def select(expression):
+    steps = parse_select(expression)
+    streamed = []
+    events = iter_events([json.dumps(DATA).encode('utf-8')])
+    select_events(events, *next(events), steps, streamed.append)
+    selected = []
+    select_values(DATA, steps, selected.append)
+
+    if streamed != selected:
+        raise AssertionError(f'{streamed} != {selected}')
+
+    return selected
+
+
+class SelectTest(unittest.TestCase):
+
+    def test_paths(self):
+        self.assertEqual(select('repository.name'), ['gqt'])
+        self.assertEqual(select('.repository.name'), ['gqt'])
+        self.assertEqual(select(''), [DATA])
+        self.assertEqual(select('repository.missing'), [])
+        self.assertEqual(select('repository.issues.nodes[*].title'),
+                         ['A', 'B', 'C', 'D'])
+        self.assertEqual(select('repository.issues.nodes[1].title'), ['B'])
+        self.assertEqual(select('repository.issues.nodes[-1].title'), ['D'])
+        self.assertEqual(select('repository.issues.nodes[9].title'), [])
+        self.assertEqual(select('repository.*.nodes[0].title'), ['A'])
+        self.assertEqual(select('repository.name[*]'), [])
+
+    def test_filters(self):
+        self.assertEqual(
+            select('repository.issues.nodes[?state == "OPEN"].title'),
+            ['A', 'C'])
+        self.assertEqual(
+            select('repository.issues.nodes[?state != "OPEN"].title'),
+            ['B', 'D'])
+        self.assertEqual(
+            select('repository.issues.nodes[?comments.count >= 3].title'),
+            ['A', 'C'])
+        self.assertEqual(
+            select('repository.issues.nodes[?state == null].title'),
+            ['D'])
+        self.assertEqual(
+            select('repository.issues.nodes[?comments.count].title'),
+            ['A', 'C'])
+
+    def test_invalid(self):
+        expressions = [
+            'a..b',
+            'a[',
+            'a[?]',
+            'a[?b ==]',
+            'a[?b == c]',
+            'a]',
+            'a b'
+        ]
+
+        for expression in expressions:
+            with self.assertRaisesRegex(Exception, 'Invalid select expression'):
+                parse_select(expression)
@@ -0,0 +1,76 @@
+import unittest
+
+from graphql.language import parse
+from graphql.language import print_ast
+
+from gqt.shard import create_sharding
+from gqt.shard import fetch_shards
+
+
+def normalize(query):
+    return print_ast(parse(query))
+
+
+class ShardTest(unittest.TestCase):
+
+    def test_create_sharding(self):
+        sharding = create_sharding(
+            'query Query {a {items(offset: 10, limit: 95) {id}}}',
+            'a.items',
+            {})
+        self.assertEqual(
+            sharding.query,
+            normalize('query Query($gqtOffset: Int, $gqtLimit: Int) {'
+                      '  a {items(offset: $gqtOffset, limit: $gqtLimit) {id}}'
+                      '}'))
+        self.assertEqual(sharding.ranges(4),
+                         [(10, 24), (34, 24), (58, 24), (82, 23)])
+        self.assertEqual(sharding.ranges(200), [(i, 1) for i in range(10, 105)])
+
+    def test_create_sharding_variables(self):
+        sharding = create_sharding(
+            'query Query($n: Int!) {items(skip: $n, first: 3) {id}}',
+            'items',
+            {'n': 5})
+        self.assertEqual(
+            sharding.query,
+            normalize('query Query($n: Int!, $gqtLimit: Int) {'
+                      '  items(skip: $n, first: $gqtLimit) {id}'
+                      '}'))
+        self.assertEqual(sharding.offset_variable, 'n')
+        self.assertEqual(sharding.ranges(2), [(5, 2), (7, 1)])
+
+    def test_create_sharding_errors(self):
+        with self.assertRaisesRegex(Exception, 'Only queries can be sharded.'):
+            create_sharding('mutation M {items(offset: 0, limit: 5) {id}}',
+                            'items',
+                            {})
+
+        with self.assertRaisesRegex(Exception,
+                                    "Field 'items' must have an offset argument"):
+            create_sharding('query Query {items(limit: 5) {id}}', 'items', {})
+
+        with self.assertRaisesRegex(Exception, 'Offset and limit must be integers.'):
+            create_sharding('query Query {items(offset: 1, limit: $x) {id}}',
+                            'items',
+                            {})
+
+        with self.assertRaisesRegex(Exception, 'Limit must be positive, not 0.'):
+            create_sharding('query Query {items(offset: 1, limit: 0) {id}}',
+                            'items',
+                            {})
+
+    def test_fetch_shards(self):
+        sharding = create_sharding('query Query {items(offset: 0, limit: 100) {id}}',
+                                   'items',
+                                   {})
+
+        def fetch(variables):
+            offset = variables['gqtOffset']
+            limit = variables['gqtLimit']
+
+            # At most 10 items per request, and 95 items in total.
+            return {'items': list(range(offset, min(offset + min(limit, 10), 95)))}
+
+        data = fetch_shards(fetch, sharding, {}, 3, 2)
+        self.assertEqual(data, {'items': list(range(95))})
@@ -0,0 +1,149 @@
+import io
+import json
+import unittest
+
+import yaml
+
+from gqt.codec import dumps_pretty
+from gqt.stream import ErrorsScanner
+from gqt.stream import YAML_DUMPER
+from gqt.stream import build_value
+from gqt.stream import iter_events
+from gqt.stream import parse_response
+from gqt.stream import write_json
+from gqt.stream import write_yaml
+
+DOCUMENTS = [
+    {},
+    [],
+    {'a': {}, 'b': [], 'c': [{}, []]},
+    {
+        'data': {
+            'repository': {
+                'issues': {
+                    'nodes': [
+                        {'title': 'Fix "quotes" \\ and ünïcödé', 'number': 1},
+                        {'title': 'Line\nbreak\ttab  ', 'number': -20},
+                        {'title': None, 'number': 1.5e-7, 'closed': True},
+                        {'title': '', 'number': 0.25, 'closed': False}
+                    ]
+                }
+            }
+        }
+    },
+    {'strings': ['true', '12', '1.5', 'null', '', 'a: b', '- x', 'multi\nline']},
+    'string',
+    12345678901234567890,
+    None
+]
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def write_json_to_string(data):
+    output = []
+    events = iter_events([data])
+    write_json(events, *next(events), output.append)
+
+    return ''.join(output)
+
+
+class StreamTest(unittest.TestCase):
+
+    def test_build_value(self):
+        for document in DOCUMENTS:
+            data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+            for size in [1, 2, 3, 7, 4096]:
+                events = iter_events(chunked(data, size))
+                self.assertEqual(build_value(events, *next(events)), document)
+
+    def test_write_json(self):
+        for document in DOCUMENTS:
+            data = json.dumps(document, separators=(',', ':')).encode('utf-8')
+            self.assertEqual(write_json_to_string(data), dumps_pretty(document))
+
+    def test_whitespace(self):
+        events = iter_events([b' \n{ "a" :\t[ 1 , 2 ] } \n'])
+        self.assertEqual(build_value(events, *next(events)), {'a': [1, 2]})
+
+    def test_invalid(self):
+        datas = [
+            (b'', 'Unexpected end of JSON.'),
+            (b'{', 'Unexpected end of JSON.'),
+            (b'{"a" 1}', "Expected ':' in JSON object."),
+            (b'{"a": 1,}', 'Expected a key in JSON object.'),
+            (b'[1 2]', "Unexpected 'value' in JSON."),
+            (b'[1,]', r"Unexpected '\]' in JSON."),
+            (b'{1: 2}', 'Expected a key in JSON object.'),
+            (b'{} {}', 'Trailing data after JSON value.'),
+            (b'{"a": tru}', "Invalid JSON near ' tru}'."),
+            (b'[1}', "Unexpected '}' in JSON.")
+        ]
+
+        for data, message in datas:
+            with self.assertRaisesRegex(Exception, message):
+                events = iter_events(chunked(data, 1))
+                build_value(events, *next(events))
+                list(events)
+
+    def test_parse_response(self):
+        response = (b'{"data": {"a": [1, 2]}, "extensions": {"cost": 5},'
+                    b' "errors": [{"message": "Oops."}]}')
+        datas = []
+
+        def data_handler(events, event, value):
+            datas.append(build_value(events, event, value))
+
+        errors = parse_response(iter_events(chunked(response, 5)), data_handler)
+        self.assertEqual(datas, [{'a': [1, 2]}])
+        self.assertEqual(errors, [{'message': 'Oops.'}])
+
+    def test_parse_response_errors_first(self):
+        response = b'{"errors": [{"message": "Oops."}], "data": {"a": 1}}'
+        datas = []
+
+        def data_handler(events, event, value):
+            datas.append(build_value(events, event, value))
+
+        errors = parse_response(iter_events([response]), data_handler)
+        self.assertEqual(datas, [])
+        self.assertEqual(errors, [{'message': 'Oops.'}])
+
+    def test_errors_scanner(self):
+        datas = [
+            (b'{"data": {"errors": [], "a": "\\"errors\\""}}', False),
+            (b'{"data": {"a": ["errors", "{", "[[["]}}', False),
+            (b'{"data": null, "errors": [{"message": "Oops."}]}', True),
+            (b'{"errors": [{"message": "Oops."}]}', True),
+            (b'{"data": {"a": "x\\\\"}, "errors": [{}]}', True),
+            (b'{"data": {"a": 1}, "errors": []}', False),
+            (b'{"data": {"a": 1}, "errors": null}', False),
+            (b'{"data": {"a": 1}, "errors" : [ ]}', False),
+            (b'{"data": "errors", "a": ["errors"]}', False),
+            (b'{"data": null, "errors": [\n  {"message": "Oops."}\n]}', True),
+            (b'["errors", [1]]', False)
+        ]
+
+        for data, has_errors in datas:
+            for size in [1, 2, 3, 100]:
+                scanner = ErrorsScanner()
+
+                for chunk in chunked(data, size):
+                    scanner.feed(chunk)
+
+                self.assertEqual(scanner.has_errors, has_errors, data)
+
+    def test_write_yaml(self):
+        for document in DOCUMENTS:
+            data = json.dumps(document).encode('utf-8')
+            events = iter_events(chunked(data, 3))
+            stream = io.StringIO()
+            write_yaml(events, *next(events), stream)
+            self.assertEqual(stream.getvalue(),
+                             yaml.dump(document,
+                                       allow_unicode=True,
+                                       sort_keys=False,
+                                       Dumper=YAML_DUMPER))
@@ -0,0 +1,85 @@
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from gqt.table import CsvWriter
+from gqt.table import SqliteWriter
+from gqt.table import flatten
+
+ROWS = [
+    {'title': 'A', 'closed': False, 'author': {'login': 'x', 'id': 1}},
+    {'title': 'B, "b"', 'closed': True, 'author': None, 'labels': ['bug']},
+    {'title': None, 'closed': None, 'author': {'login': 'y', 'id': 2}}
+]
+
+
+class TableTest(unittest.TestCase):
+
+    def test_flatten(self):
+        self.assertEqual(flatten({'a': {'b': {'c': 1}, 'd': [1, 2]}, 'e': {}}),
+                         {'a.b.c': 1, 'a.d': '[1,2]', 'e': '{}'})
+        self.assertEqual(flatten(5), {'value': 5})
+
+    def test_csv(self):
+        stream = io.StringIO()
+        writer = CsvWriter(stream, ',')
+
+        for row in ROWS:
+            writer.write(row)
+
+        writer.close()
+        self.assertEqual(stream.getvalue(),
+                         'title,closed,author.login,author.id,author,labels\n'
+                         'A,false,x,1,,\n'
+                         '"B, ""b""",true,,,,"[""bug""]"\n'
+                         ',,y,2,,\n')
+
+    def test_csv_column_after_header(self):
+        stream = io.StringIO()
+        writer = CsvWriter(stream, ',', buffer_size=1)
+
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            for row in ROWS:
+                writer.write(row)
+
+            writer.close()
+
+        self.assertEqual(stream.getvalue(),
+                         'title,closed,author.login,author.id\n'
+                         'A,false,x,1\n'
+                         '"B, ""b""",true,,\n'
+                         ',,y,2\n')
+        self.assertEqual(stderr.getvalue(),
+                         "warning: Column 'labels' not in the header, dropped.\n")
+
+    def test_tsv(self):
+        stream = io.StringIO()
+        writer = CsvWriter(stream, '\t')
+        writer.write({'a': 1, 'b': 'x y'})
+        writer.close()
+        self.assertEqual(stream.getvalue(), 'a\tb\n1\tx y\n')
+
+    def test_sqlite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rows.db')
+            writer = SqliteWriter(path, 'issues', batch_size=2)
+
+            for row in ROWS:
+                writer.write(row)
+
+            writer.close()
+            connection = sqlite3.connect(path)
+            rows = connection.execute(
+                'SELECT title, closed, "author.login", "author.id", labels '
+                'FROM issues').fetchall()
+            connection.close()
+
+        self.assertEqual(rows,
+                         [
+                             ('A', 0, 'x', 1, None),
+                             ('B, "b"', 1, None, None, '["bug"]'),
+                             (None, None, 'y', 2, None)
+                         ])
@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import patch
+
+from gqt.watch import format_diff
+from gqt.watch import watch
+
+
+class WatchTest(unittest.TestCase):
+
+    def test_format_diff(self):
+        old = {'data': {'a': 1, 'b': [1, 2], 'c': {'d': 'x'}, 'e': True}}
+        new = {'data': {'a': 2, 'b': [1], 'c': {'d': 'x'}, 'e': 1, 'f': None}}
+
+        self.assertEqual(format_diff(old, new),
+                         '- data.a: 1\n'
+                         '+ data.a: 2\n'
+                         '- data.b[1]: 2\n'
+                         '- data.e: true\n'
+                         '+ data.e: 1\n'
+                         '+ data.f: null')
+
+    def test_format_diff_unchanged(self):
+        self.assertEqual(format_diff({'a': [{'b': 1}]}, {'a': [{'b': 1}]}), '')
+
+    @patch('gqt.watch.time.sleep')
+    def test_watch(self, sleep):
+        responses = iter([
+            {'data': {'a': 1}, 'extensions': {'b': 1}},
+            None,
+            {'data': {'a': 1}, 'extensions': {'b': 2}},
+            {'data': {'a': 2}, 'errors': [{'message': 'c'}]}
+        ])
+        shown = []
+        errors = []
+
+        watch(lambda: next(responses),
+              10,
+              lambda data: shown.append(data),
+              lambda text: shown.append(text),
+              lambda response_errors: errors.append(response_errors),
+              iterations=4)
+
+        self.assertEqual(shown, [{'a': 1}, '- a: 1\n+ a: 2'])
+        self.assertEqual(errors, [[], [], [{'message': 'c'}]])
+        self.assertEqual(sleep.call_count, 3)
+
+        for call in sleep.call_args_list:
+            self.assertTrue(9 <= call.args[0] <= 11)